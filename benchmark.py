@@ -0,0 +1,554 @@
+#!/usr/bin/env python3
+"""
+Master Whale Scanner - offline benchmark
+========================================
+Runs MasterWhaleScanner end to end against a local fake of Etherscan,
+BlockCypher and Solscan, writing to either an in-process stand-in or a
+scratch PostgreSQL database, and reports throughput and per-stage latency.
+
+    python benchmark.py                                  # 100, 500 and 5000 tokens, in-memory DB
+    python benchmark.py --sizes 500 --latency-ms 80 --error-429 0.02
+    python benchmark.py --database-url postgresql://localhost/whale_bench
+    python benchmark.py --fixtures fixtures/ --json results.json
+
+The fake server synthesises tokentx, /blocks/{height} (txids), /txs and /account/transfer
+payloads. With --fixtures, recorded responses (tokentx.json, txs.json,
+transfer.json) are replayed instead, with hashes and block numbers rewritten
+so every run stays unique. Production rate limits apply unless --rps is given,
+except BlockCypher: Bitcoin work does not grow with the token count, so only
+--btc-blocks blocks are scanned, at --btc-rps.
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import random
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+from urllib.parse import parse_qs, urlsplit
+
+import whale_discovery_scanner as scanner_module
+
+ETH_HEAD = 20_000_000
+BTC_HEAD = 850_000
+SOL_SLOT = 280_000_000
+TOKEN_PRICE = 1.0
+BTC_PRICE = 60_000.0
+SOL_PRICE = 150.0
+BASE58 = '123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz'
+
+def digest(*parts):
+    """Deterministic hex digest of parts"""
+    return hashlib.sha256('|'.join(str(part) for part in parts).encode()).hexdigest()
+
+def base58_id(length, *parts):
+    """Deterministic base58 string, e.g. a Solana address or signature"""
+    chars = []
+    block = 0
+    while len(chars) < length:
+        chars.extend(BASE58[byte % 58] for byte in hashlib.sha256(f"{digest(*parts)}|{block}".encode()).digest())
+        block += 1
+    return ''.join(chars[:length])
+
+def load_fixture(directory, name, key):
+    """Records of a recorded response - the bare list or the list under key"""
+    if not directory:
+        return None
+    path = os.path.join(directory, name)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        data = json.load(f)
+    records = data.get(key, []) if isinstance(data, dict) else data
+    return records or None
+
+class FakeProviders:
+    """Payload generator behind the fake HTTP server
+
+    Every response is a pure function of its request and the run tag (one
+    seeded RNG per page), so retried pages come back identical and
+    concurrent runs never collide.
+    """
+
+    def __init__(self, options, run_tag):
+        self.options = options
+        self.run_tag = run_tag
+        self.tokentx_fixture = load_fixture(options.fixtures, 'tokentx.json', 'result')
+        self.tx_fixture = load_fixture(options.fixtures, 'txs.json', 'txs')
+        self.transfer_fixture = load_fixture(options.fixtures, 'transfer.json', 'data')
+
+    def whale_or_small(self, rng, decimals, price):
+        """Raw amount - a whale with probability whale_ratio"""
+        if rng.random() < self.options.whale_ratio:
+            usd = rng.uniform(scanner_module.WHALE_THRESHOLD_USD, 250_000)
+        else:
+            usd = rng.uniform(1, scanner_module.WHALE_THRESHOLD_USD * 0.9)
+        return int(usd / price * 10 ** decimals)
+
+    def tokentx(self, params):
+        contract = params['contractaddress'].lower()
+        start, end = int(params['startblock']), int(params['endblock'])
+        page, offset = int(params.get('page', 1)), int(params.get('offset', 1000))
+
+        # Transfer density is per mainnet day of blocks
+        count = round(self.options.transfers_per_token * (end - start + 1) / scanner_module.ETH_DEFAULT_LOOKBACK_BLOCKS)
+        first = (page - 1) * offset
+        rng = random.Random(digest(self.run_tag, contract, start, page))
+        transfers = []
+
+        for index in range(first, min(count, first + offset)):
+            template = self.tokentx_fixture[index % len(self.tokentx_fixture)] if self.tokentx_fixture else {}
+            transfer = dict(template)
+            transfer.update({
+                'hash': f"0x{rng.getrandbits(256):064x}",
+                'blockNumber': str(start + (end - start) * index // max(1, count)),
+                'timeStamp': str(int(time.time()) - 3600),
+                'contractAddress': contract,
+                'logIndex': str(index % 200),
+                'transactionIndex': str(index % 150),
+            })
+            if not template:
+                transfer.update({
+                    'from': f"0x{rng.getrandbits(160):040x}",
+                    'to': f"0x{rng.getrandbits(160):040x}",
+                    'value': str(self.whale_or_small(rng, 18, TOKEN_PRICE)),
+                    'tokenDecimal': '18',
+                    'gasUsed': '52000',
+                    'gasPrice': '20000000000',
+                })
+            transfers.append(transfer)
+
+        if not transfers:
+            return {'status': '0', 'message': 'No transactions found', 'result': []}
+        return {'status': '1', 'message': 'OK', 'result': transfers}
+
+    def btc_txid(self, height, index):
+        """Fake txid - the last 16 hex digits carry height and index so /txs can rebuild the transaction"""
+        return digest(self.run_tag, 'btc', height, index)[:48] + f"{height:08x}{index:08x}"
+
+    def btc_block(self, height, params):
+        """One /blocks/{height} page - like BlockCypher, txids only"""
+        txstart, limit = int(params.get('txstart', 0)), int(params.get('limit', 500))
+        n_tx = self.options.btc_txs_per_block
+        txids = [self.btc_txid(height, index) for index in range(txstart, min(n_tx, txstart + limit))]
+        return {'height': height, 'n_tx': n_tx, 'txids': txids}
+
+    def btc_txs(self, hashes):
+        """/txs/{hash;hash;...} - a list for a batch, the bare object for one hash"""
+        confirmed = datetime.now(timezone.utc).replace(microsecond=0).isoformat().replace('+00:00', 'Z')
+        txs = []
+
+        for tx_hash in hashes:
+            height, index = int(tx_hash[48:56], 16), int(tx_hash[56:], 16)
+            rng = random.Random(tx_hash)
+            template = self.tx_fixture[index % len(self.tx_fixture)] if self.tx_fixture else {}
+            tx = dict(template)
+            tx.update({'hash': tx_hash, 'block_height': height, 'confirmed': confirmed})
+            if not template:
+                total = self.whale_or_small(rng, 8, BTC_PRICE)
+                tx.update({
+                    'total': total,
+                    'inputs': [{'output_value': total + 1000, 'addresses': ['1' + ''.join(rng.choices(BASE58, k=33))]}],
+                    'outputs': [{'value': total, 'addresses': ['1' + ''.join(rng.choices(BASE58, k=33))]}],
+                })
+            txs.append(tx)
+
+        return txs if len(txs) != 1 else txs[0]
+
+    def sol_transfers(self, params):
+        address = params['address']
+        page, page_size = int(params.get('page', 1)), int(params.get('page_size', 100))
+        count = self.options.sol_transfers_per_address
+        rng = random.Random(digest(self.run_tag, address, page))
+        data = []
+
+        for index in range((page - 1) * page_size, min(count, page * page_size)):
+            template = self.transfer_fixture[index % len(self.transfer_fixture)] if self.transfer_fixture else {}
+            tx = dict(template)
+            tx.update({
+                'trans_id': ''.join(rng.choices(BASE58, k=88)),
+                'slot': SOL_SLOT - index,
+                'block_time': int(time.time()) - index,
+            })
+            if not template:
+                tx.update({
+                    'amount': self.whale_or_small(rng, 9, SOL_PRICE),
+                    'source': address,
+                    'destination': ''.join(rng.choices(BASE58, k=44)),
+                })
+            data.append(tx)
+
+        return {'success': True, 'data': data}
+
+class FakeProviderHandler(BaseHTTPRequestHandler):
+    """Routes /etherscan, /blockcypher and /solscan requests with injected latency and 429s"""
+
+    protocol_version = 'HTTP/1.1'  # Keep-alive, like the real providers
+
+    def do_GET(self):
+        server = self.server
+        url = urlsplit(self.path)
+        params = {name: values[-1] for name, values in parse_qs(url.query).items()}
+
+        with server.lock:
+            delay = server.options.latency_ms / 1000 * server.rng.uniform(0.5, 1.5)
+            throttle = server.rng.random() < server.options.error_429
+        with server.requests.get_lock():
+            server.requests.value += 1
+        time.sleep(delay)
+
+        if throttle:
+            with server.throttled.get_lock():
+                server.throttled.value += 1
+            return self.reply(429, {'message': 'Too Many Requests'}, {'Retry-After': str(server.options.retry_after)})
+
+        providers = server.providers
+        if url.path == '/etherscan/v2/api':
+            if params.get('action') == 'eth_blockNumber':
+                return self.reply(200, {'jsonrpc': '2.0', 'id': 83, 'result': hex(ETH_HEAD)})
+            return self.reply(200, providers.tokentx(params))
+        if url.path == '/blockcypher/v1/btc/main':
+            return self.reply(200, {'name': 'BTC.main', 'height': BTC_HEAD})
+        if url.path.startswith('/blockcypher/v1/btc/main/blocks/'):
+            return self.reply(200, providers.btc_block(int(url.path.rsplit('/', 1)[1]), params))
+        if url.path.startswith('/blockcypher/v1/btc/main/txs/'):
+            return self.reply(200, providers.btc_txs(url.path.rsplit('/', 1)[1].split(';')))
+        if url.path == '/solscan/v2.0/account/transfer':
+            return self.reply(200, providers.sol_transfers(params))
+        return self.reply(404, {'error': f'unknown path {url.path}'})
+
+    def reply(self, status, payload, headers=None):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # One line per request would drown the report
+
+def serve_fake_providers(options, run_tag, requests_sent, throttled, ports):
+    """Child process body - serve FakeProviders on a free localhost port until terminated"""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FakeProviderHandler)
+    server.daemon_threads = True
+    server.options = options
+    server.providers = FakeProviders(options, run_tag)
+    server.rng = random.Random(options.seed)
+    server.lock = threading.Lock()
+    server.requests = requests_sent
+    server.throttled = throttled
+    ports.put(server.server_address[1])
+    server.serve_forever()
+
+@contextmanager
+def fake_provider_server(options, run_tag):
+    """Run the fake providers in a child process, yields (url, requests, throttled)
+
+    A separate process keeps payload generation from competing with the
+    scanner for the GIL, so measured latency is the injected latency.
+    """
+    requests_sent = multiprocessing.Value('l', 0)
+    throttled = multiprocessing.Value('l', 0)
+    ports = multiprocessing.Queue()
+    process = multiprocessing.Process(
+        target=serve_fake_providers, args=(options, run_tag, requests_sent, throttled, ports),
+        name='fake-providers', daemon=True,
+    )
+    process.start()
+    try:
+        server = SimpleNamespace(url=f"http://127.0.0.1:{ports.get(timeout=30)}", requests=requests_sent, throttled=throttled)
+        yield server
+    finally:
+        process.terminate()
+        process.join()
+
+class MemoryConnection:
+    """Connection stand-in - the benchmark scanner never issues SQL through it"""
+
+    def execute(self, *args, **kwargs):
+        return self
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+class MemoryPool:
+    """DatabasePool stand-in for runs without PostgreSQL"""
+
+    def __init__(self, conninfo=None, min_size=0, max_size=1):
+        self.max_size = max_size
+
+    @contextmanager
+    def connection(self):
+        yield MemoryConnection()
+
+    def close(self):
+        pass
+
+class BenchmarkScanner(scanner_module.MasterWhaleScanner):
+    """MasterWhaleScanner with synthetic tokens, fake provider URLs and a fresh start every run"""
+
+    def __init__(self, token_count, options, server_url, run_tag):
+        self.token_count = token_count
+        self.options = options
+        self.run_tag = run_tag
+        self.memory_rows = {}
+        self.memory_checkpoints = {}
+        self.inserted_ids = []  # Rows this run added to PostgreSQL
+        self.inserted_wallets = set()  # wallet_accounts rows this run created
+        super().__init__(scanner_module.ScannerConfig(
+            database_url=options.database_url or 'memory',
+            etherscan_api_key='benchmark',  # The fake server ignores credentials
+            coingecko_api_key='benchmark',
+            kraken_api_key='benchmark',
+            kraken_private_key='benchmark',
+            blockcypher_api_key='benchmark',
+            solscan_api_key='benchmark',
+        ))
+
+        self.etherscan.base_url = f"{server_url}/etherscan/v2/api"
+        self.blockcypher.base_url = f"{server_url}/blockcypher/v1/btc/main"
+        self.solscan.base_url = f"{server_url}/solscan/v2.0"
+
+        if options.rps:
+            for api in (self.etherscan, self.blockcypher, self.solscan):
+                api.rate_limiter = scanner_module.TokenBucketRateLimiter(options.rps, max(1, int(options.rps // 4)))
+        if options.btc_rps:
+            self.blockcypher.rate_limiter = scanner_module.TokenBucketRateLimiter(options.btc_rps, max(1, int(options.btc_rps // 4)))
+
+        # Only the synthetic scopes ever reach a real checkpoint table
+        self.bench_scopes = {
+            scanner_module.evm_scope(token_info['address'], token_info.get('chain_id', 1))
+            for token_info in self.tokens_to_scan.values() if token_info.get('address')
+        }
+        self.bench_scopes.update(f"sol:{address}" for address in scanner_module.SOLANA_WHALE_ADDRESSES)
+
+    def load_tokens_for_scanning(self):
+        tokens = {
+            f"BENCH{index:05d}": {
+                'coingecko_id': 'bench-token',
+                'decimals': 18,
+                'address': '0x' + digest(self.run_tag, 'contract', index)[:40],
+                'chain_id': 1,
+            }
+            for index in range(self.token_count)
+        }
+        tokens['BTC'] = {'coingecko_id': 'bitcoin', 'decimals': 8, 'address': None}
+        tokens['SOL'] = {'coingecko_id': 'solana', 'decimals': 9, 'address': None}
+        return tokens
+
+    def get_prices_from_database(self):
+        return {'bench-token': TOKEN_PRICE, 'bitcoin': BTC_PRICE, 'solana': SOL_PRICE}
+
+    def load_checkpoints(self):
+        return {}  # Every run scans the default lookback window
+
+    def save_checkpoints(self, checkpoints):
+        if self.options.database_url:
+            checkpoints = {scope: block for scope, block in checkpoints.items() if scope in self.bench_scopes}
+            return super().save_checkpoints(checkpoints) if checkpoints else True
+
+        with scanner_module.METRICS.timer('db_write_seconds', operation='checkpoints'):
+            self.memory_checkpoints.update(checkpoints)
+        return True
+
+    def warm_recent_ids(self):
+        if self.options.database_url:
+            super().warm_recent_ids()
+
+    def load_whale_yields(self):
+        return None  # No history - every token counts as active
+
+    @contextmanager
+    def scan_lock(self):
+        if self.options.database_url:
+            with super().scan_lock() as acquired:
+                yield acquired
+        else:
+            yield True
+
+    def insert_transaction_batch(self, conn, batch):
+        if self.options.database_url:
+            wallet_addresses = sorted({tx.wallet_address for tx in batch})
+            existing = conn.execute(
+                "SELECT wallet_address FROM wallet_accounts WHERE wallet_address = ANY(%s)", (wallet_addresses,)
+            ).fetchall()
+            self.inserted_wallets.update(set(wallet_addresses) - {row[0] for row in existing})
+            inserted = super().insert_transaction_batch(conn, batch)
+            self.inserted_ids.extend(inserted)
+            return inserted
+
+        # Simulated round trip, then ON CONFLICT DO NOTHING semantics
+        time.sleep(self.options.db_latency_ms / 1000)
+        inserted = []
+        for tx in batch:
+            if tx.transaction_id not in self.memory_rows:
+                self.memory_rows[tx.transaction_id] = tx.as_row()
+                inserted.append(tx.transaction_id)
+        return inserted
+
+    def cleanup(self):
+        """Delete the rows, wallets and checkpoints this run wrote to PostgreSQL"""
+        if not self.options.database_url:
+            return
+
+        with self.db_pool.connection() as conn:
+            conn.execute("DELETE FROM whale_transactions WHERE transaction_id = ANY(%s)", (self.inserted_ids,))
+            conn.execute("DELETE FROM wallet_accounts WHERE wallet_address = ANY(%s)", (sorted(self.inserted_wallets),))
+            conn.execute("DELETE FROM scanner_checkpoints WHERE scope = ANY(%s)", (sorted(self.bench_scopes),))
+            conn.commit()
+
+def histogram_quantile(metric, quantile):
+    """Upper bound of the bucket holding the quantile - None for an empty histogram"""
+    if not metric['count']:
+        return None
+
+    rank = quantile * metric['count']
+    cumulative = 0
+    for bound, count in metric['buckets'].items():
+        cumulative += count
+        if cumulative >= rank:
+            return float('inf') if bound == '+Inf' else float(bound)
+    return float('inf')
+
+def format_seconds(value):
+    if value is None:
+        return '-'
+    if value == float('inf'):
+        return '>max'
+    return f"{value * 1000:.0f}ms" if value < 10 else f"{value:.0f}s"
+
+def summarize(token_count, wall_seconds, success, server, snapshot):
+    """Throughput and per-stage latency of one run"""
+    counters = {}
+    for metric in snapshot['counters']:
+        label = ','.join(f"{name}={value}" for name, value in sorted(metric['labels'].items()))
+        counters[f"{metric['name']}{{{label}}}" if label else metric['name']] = metric['value']
+
+    stages = []
+    for metric in snapshot['histograms']:
+        label = ','.join(str(value) for _, value in sorted(metric['labels'].items()))
+        stages.append({
+            'stage': f"{metric['name']}[{label}]" if label else metric['name'],
+            'count': metric['count'],
+            'total_seconds': metric['sum'],
+            'mean_seconds': metric['sum'] / metric['count'] if metric['count'] else None,
+            'p50_seconds': histogram_quantile(metric, 0.5),
+            'p95_seconds': histogram_quantile(metric, 0.95),
+        })
+
+    fetched = sum(value for name, value in counters.items() if name.startswith('transfers_fetched_total'))
+    inserted = counters.get('rows_total{stage=inserted}', 0)
+
+    return {
+        'tokens': token_count,
+        'success': success,
+        'wall_seconds': wall_seconds,
+        'tokens_per_second': token_count / wall_seconds,
+        'transfers_per_second': fetched / wall_seconds,
+        'rows_per_second': inserted / wall_seconds,
+        'server_requests': server.requests.value,
+        'server_429s': server.throttled.value,
+        'counters': counters,
+        'stages': stages,
+    }
+
+def print_report(result):
+    print(f"\n📊 {result['tokens']:,} tokens - {'ok' if result['success'] else 'FAILED'} in {result['wall_seconds']:.1f}s")
+    print(f"   {result['tokens_per_second']:.1f} tokens/s, {result['transfers_per_second']:,.0f} transfers/s, "
+          f"{result['rows_per_second']:,.0f} rows/s, {result['server_requests']:,} requests ({result['server_429s']} x 429)")
+    print(f"   {'stage':<48} {'count':>8} {'total':>8} {'mean':>8} {'p50':>8} {'p95':>8}")
+    for stage in sorted(result['stages'], key=lambda stage: -stage['total_seconds']):
+        print(f"   {stage['stage']:<48} {stage['count']:>8,} {stage['total_seconds']:>7.1f}s "
+              f"{format_seconds(stage['mean_seconds']):>8} {format_seconds(stage['p50_seconds']):>8} {format_seconds(stage['p95_seconds']):>8}")
+    rows = {name.split('=')[1].rstrip('}'): value for name, value in result['counters'].items() if name.startswith('rows_total')}
+    print("   rows: " + ', '.join(f"{stage} {count:,}" for stage, count in sorted(rows.items())))
+
+def run_benchmark(token_count, options):
+    """One full scan cycle over token_count synthetic tokens"""
+    run_tag = f"bench-{token_count}-{time.time_ns()}"
+    scanner_module.METRICS = scanner_module.ScannerMetrics()  # Per-run numbers
+    scanner_module.SOLANA_WHALE_ADDRESSES = [base58_id(44, run_tag, 'watch', index) for index in range(options.sol_addresses)]
+
+    with fake_provider_server(options, run_tag) as server:
+        scanner = BenchmarkScanner(token_count, options, server.url, run_tag)
+        try:
+            started = time.perf_counter()
+            success = scanner.run_master_scan()
+            wall_seconds = time.perf_counter() - started
+            result = summarize(token_count, wall_seconds, success, server, scanner_module.METRICS.snapshot())
+            scanner.cleanup()
+        finally:
+            scanner.close()
+
+    return result
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0], formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default='100,500,5000', help='comma-separated token counts (default: 100,500,5000)')
+    parser.add_argument('--database-url', default=None,
+                        help='scratch PostgreSQL database with the scanner schema (default: in-process stand-in)')
+    parser.add_argument('--db-latency-ms', type=float, default=5.0, help='stand-in round trip per insert batch (default: 5)')
+    parser.add_argument('--latency-ms', type=float, default=40.0, help='mean fake provider latency, +/-50%% jitter (default: 40)')
+    parser.add_argument('--error-429', type=float, default=0.0, help='share of requests answered with HTTP 429 (default: 0)')
+    parser.add_argument('--retry-after', type=float, default=0.5, help='Retry-After seconds sent with each 429 (default: 0.5)')
+    parser.add_argument('--rps', type=float, default=None, help='override every provider rate limit (default: production limits)')
+    parser.add_argument('--transfers-per-token', type=int, default=300, help='tokentx transfers per token per day (default: 300)')
+    parser.add_argument('--whale-ratio', type=float, default=0.05, help='share of transfers above the whale threshold (default: 0.05)')
+    parser.add_argument('--btc-txs-per-block', type=int, default=500, help='transactions per Bitcoin block (default: 500)')
+    parser.add_argument('--btc-blocks', type=int, default=1, help='Bitcoin blocks scanned per run (default: 1)')
+    parser.add_argument('--btc-rps', type=float, default=100.0,
+                        help='BlockCypher rate limit, billed per transaction (default: 100, 0 = production limit or --rps)')
+    parser.add_argument('--sol-addresses', type=int, default=10, help='watched Solana addresses (default: 10)')
+    parser.add_argument('--sol-transfers-per-address', type=int, default=100, help='Solscan transfers per address (default: 100)')
+    parser.add_argument('--fixtures', default=None, help='directory with recorded tokentx.json, txs.json and transfer.json to replay')
+    parser.add_argument('--seed', type=int, default=1, help='seed for latency jitter and 429 injection (default: 1)')
+    parser.add_argument('--json', dest='json_path', default=None, help='also write the results to this JSON file')
+    parser.add_argument('--verbose', action='store_true', help='keep the scanner INFO logs')
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    options = parse_args(argv)
+    sizes = [int(size) for size in options.sizes.split(',') if size.strip()]
+
+    scanner_module.configure_logging()
+    if not options.verbose:
+        logging.getLogger(scanner_module.__name__).setLevel(logging.WARNING)
+    if not options.database_url:
+        scanner_module.DatabasePool = MemoryPool
+    scanner_module.RESPONSE_CACHE_PATH = ''  # Every run measures real fetches
+    scanner_module.BTC_MAX_BLOCKS_PER_CYCLE = options.btc_blocks  # Same Bitcoin work at every size
+    scanner_module.METRICS_PATH = ''
+
+    print(f"🏁 Benchmark: {', '.join(f'{size:,}' for size in sizes)} tokens against fake providers "
+          f"({options.latency_ms:.0f}ms latency, {options.error_429:.1%} 429s, "
+          f"{'PostgreSQL' if options.database_url else 'in-memory DB'})")
+
+    results = []
+    for size in sizes:
+        result = run_benchmark(size, options)
+        print_report(result)
+        results.append(result)
+
+    if options.json_path:
+        with open(options.json_path, 'w') as f:
+            json.dump({'options': vars(options), 'results': results}, f, indent=2, default=str)
+        print(f"\n💾 Results written to {options.json_path}")
+
+    return 0 if all(result['success'] for result in results) else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
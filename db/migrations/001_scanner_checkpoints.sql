@@ -0,0 +1,13 @@
+-- Master Whale Scanner - incremental scan checkpoints
+-- One high-water mark per scan scope so each run only covers new blocks:
+--   'eth:<contract address>'  last fully scanned Ethereum block for that contract
+--   'btc'                     last fully scanned Bitcoin block height
+--   'sol:<address>'           newest Solana slot seen for a watched address
+--
+-- Apply with: psql "$TRINITY_DATABASE_URL" -f db/migrations/001_scanner_checkpoints.sql
+
+CREATE TABLE IF NOT EXISTS scanner_checkpoints (
+    scope       TEXT PRIMARY KEY,
+    last_block  BIGINT NOT NULL,
+    updated_at  TIMESTAMPTZ NOT NULL DEFAULT now()
+);
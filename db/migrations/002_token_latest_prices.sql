@@ -0,0 +1,30 @@
+-- Master Whale Scanner - latest price per coin symbol
+-- Replaces the DISTINCT ON / FIRST_VALUE scan over all of whale_transactions at
+-- startup with a primary-key read. The scanner upserts this table whenever it
+-- writes whale rows; the index and backfill below seed it from existing history.
+--
+-- Apply with: psql "$TRINITY_DATABASE_URL" -f db/migrations/002_token_latest_prices.sql
+
+CREATE TABLE IF NOT EXISTS token_latest_prices (
+    coin_symbol      TEXT PRIMARY KEY,
+    price_per_token  NUMERIC NOT NULL,
+    block_timestamp  TIMESTAMP NOT NULL,
+    updated_at       TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+-- Latest priced row per symbol without sorting the whole table
+CREATE INDEX IF NOT EXISTS idx_whale_transactions_symbol_priced_ts
+    ON whale_transactions (coin_symbol, block_timestamp DESC)
+    INCLUDE (price_per_token)
+    WHERE price_per_token > 0;
+
+INSERT INTO token_latest_prices (coin_symbol, price_per_token, block_timestamp)
+SELECT DISTINCT ON (coin_symbol) coin_symbol, price_per_token, block_timestamp
+FROM whale_transactions
+WHERE price_per_token > 0
+ORDER BY coin_symbol, block_timestamp DESC
+ON CONFLICT (coin_symbol) DO UPDATE
+SET price_per_token = EXCLUDED.price_per_token,
+    block_timestamp = EXCLUDED.block_timestamp,
+    updated_at = now()
+WHERE EXCLUDED.block_timestamp >= token_latest_prices.block_timestamp;
@@ -0,0 +1,10 @@
+-- Master Whale Scanner - newest-first index for the dedup warm-up
+-- At startup the scanner loads the most recent transaction IDs into its
+-- in-memory dedup index. This index turns that ORDER BY ... LIMIT into an
+-- index-only walk instead of a sort of the whole table.
+--
+-- Apply with: psql "$TRINITY_DATABASE_URL" -f db/migrations/003_whale_transactions_recent_index.sql
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_whale_transactions_block_ts_recent
+    ON whale_transactions (block_timestamp DESC)
+    INCLUDE (transaction_id);
@@ -0,0 +1,10 @@
+-- Master Whale Scanner - EVM chain per token
+-- Etherscan V2 serves every supported EVM chain from one endpoint, selected by
+-- chainid. Tokens default to Ethereum mainnet; set chain_id for tokens whose
+-- ethereum_contract_address lives on another chain (42161 Arbitrum, 8453 Base,
+-- 56 BSC, 137 Polygon). Checkpoint scopes for those are eth:<chainid>:<contract>.
+--
+-- Apply with: psql "$TRINITY_DATABASE_URL" -f db/migrations/004_supported_symbols_chain_id.sql
+
+ALTER TABLE supported_symbols
+    ADD COLUMN IF NOT EXISTS chain_id INTEGER NOT NULL DEFAULT 1;
@@ -0,0 +1,15 @@
+-- Master Whale Scanner - block hashes of the scanned chain tail
+-- The Bitcoin checkpoint moves up to the scanned head. The hashes of the
+-- newest blocks below it are kept here, and each run re-checks them with one
+-- cheap block lookup per height; only heights whose hash changed (a reorg)
+-- are scanned again. Older rows are pruned as the checkpoint advances.
+--
+-- Apply with: psql "$TRINITY_DATABASE_URL" -f db/migrations/005_scanner_block_hashes.sql
+
+CREATE TABLE IF NOT EXISTS scanner_block_hashes (
+    scope       TEXT NOT NULL,
+    height      BIGINT NOT NULL,
+    block_hash  TEXT NOT NULL,
+    updated_at  TIMESTAMPTZ NOT NULL DEFAULT now(),
+    PRIMARY KEY (scope, height)
+);
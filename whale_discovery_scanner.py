@@ -16,119 +16,1209 @@ SPECIFICATIONS:
 
 import sys
 import os
-
-# IMMEDIATE DEBUG - before anything else
-print("🔧 MASTER WHALE SCANNER: Script starting...", flush=True)
-sys.stdout.flush()
-os.environ['PYTHONUNBUFFERED'] = '1'
-print("🔧 MASTER WHALE SCANNER: Unbuffered mode set", flush=True)
-
 import requests
 import time
 import json
+import email.utils
+import hashlib
+import sqlite3
+import asyncio
+import bisect
+import math
+import multiprocessing
+import queue
+import random
+import signal
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass, field as dataclass_field
+from decimal import Context, Decimal, InvalidOperation, ROUND_CEILING, ROUND_FLOOR
+from functools import lru_cache
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timedelta
+from urllib.parse import urlsplit
 import logging
 
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry, make_headers
+
+import psycopg
+from psycopg import IntegrityError, DataError
+from psycopg.pq import TransactionStatus
+
 try:
-    import psycopg
-    from psycopg import IntegrityError, DataError
+    import orjson  # Optional - faster JSON encode/decode when installed
 except ImportError:
-    print("❌ Installing psycopg...", flush=True)
-    os.system("pip install psycopg[binary]")
-    import psycopg
-    from psycopg import IntegrityError, DataError
+    orjson = None
+
+try:
+    import httpx  # Optional - HTTP/2 sessions with HTTP2_ENABLED=1 and httpx[http2] installed
+except ImportError:
+    httpx = None
+
+logger = logging.getLogger(__name__)
 
-print("🔧 MASTER WHALE SCANNER: Modules imported", flush=True)
+def env_number(name, default, cast):
+    """Numeric tunable from the environment - default (with a warning) when malformed"""
+    value = os.getenv(name, '').strip()
+    if not value:
+        return default
+    try:
+        return cast(value)
+    except ValueError:
+        logger.warning(f"{name}={value!r} is not a valid {cast.__name__} - using the default {default}")
+        return default
+
+def env_int(name, default):
+    """Integer tunable from the environment"""
+    return env_number(name, default, int)
+
+def env_float(name, default):
+    """Float tunable from the environment"""
+    return env_number(name, default, float)
 
 # MASTER SCANNER IDENTIFICATION
 SCANNER_NAME = "Master_Whale_Scanner"
 SCANNER_VERSION = "master_whale_scanner_v1.0"
 SCANNER_SCHEDULE = "every_24_hours"  # Free tier compliance
 
-print(f"🔥 {SCANNER_NAME} LOADING...", flush=True)
-
-# Configuration - ALL KEYS FROM ENVIRONMENT VARIABLES
-DB_URL = os.getenv('TRINITY_DATABASE_URL')
-ETHERSCAN_API_KEY = os.getenv('ETHERSCAN_API_KEY')
-COINGECKO_API_KEY = os.getenv('COINGECKO_API_KEY')
-KRAKEN_API_KEY = os.getenv('KRAKEN_API_KEY')
-KRAKEN_PRIVATE_KEY = os.getenv('KRAKEN_PRIVATE_KEY')
-BLOCKCYPHER_API_KEY = os.getenv('BLOCKCYPHER_API_KEY')
-SOLSCAN_API_KEY = os.getenv('SOLSCAN_API_KEY')
-
-print("🔧 MASTER WHALE SCANNER: Environment variables loaded", flush=True)
-
-# Validate required environment variables
-if not DB_URL:
-    raise ValueError("❌ TRINITY_DATABASE_URL environment variable is required")
-if not ETHERSCAN_API_KEY:
-    raise ValueError("❌ ETHERSCAN_API_KEY environment variable is required") 
-if not COINGECKO_API_KEY:
-    raise ValueError("❌ COINGECKO_API_KEY environment variable is required")
-if not KRAKEN_API_KEY:
-    raise ValueError("❌ KRAKEN_API_KEY environment variable is required")
-if not KRAKEN_PRIVATE_KEY:
-    raise ValueError("❌ KRAKEN_PRIVATE_KEY environment variable is required")
-if not BLOCKCYPHER_API_KEY:
-    raise ValueError("❌ BLOCKCYPHER_API_KEY environment variable is required")
-if not SOLSCAN_API_KEY:
-    raise ValueError("❌ SOLSCAN_API_KEY environment variable is required")
-
-print("🔧 MASTER WHALE SCANNER: Environment variables validated", flush=True)
-
 # Master scanner configuration - optimized for 24-hour cycles
 WHALE_THRESHOLD_USD = 500  # $500 catches ALL whale activity (retail + institutional)
-ETHERSCAN_DELAY = 0.2   # 5 calls/second for Free Plan (0.2s = 5/sec)
-COINGECKO_DELAY = 0.12  # 500 calls/minute = 8.33/sec, use 0.12s for safety
 MAX_USD_AMOUNT = 100_000_000
 COINGECKO_PRO_BASE_URL = "https://pro-api.coingecko.com/api/v3"
 
-# Additional stdout configuration
-sys.stdout.reconfigure(line_buffering=True)
-sys.stderr.reconfigure(line_buffering=True)
-
-# Enhanced logging for Master Scanner
-logging.basicConfig(
-    level=logging.INFO, 
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[logging.StreamHandler(sys.stdout)],
-    force=True
-)
-logger = logging.getLogger(__name__)
+# Exact token amounts - wide enough for any uint256 raw value
+AMOUNT_CONTEXT = Context(prec=100)
+USD_CENTS = Decimal('0.01')
+
+# Token-bucket rate budgets (calls/sec, burst) - override per plan via environment
+ETHERSCAN_CALLS_PER_SEC = env_float('ETHERSCAN_CALLS_PER_SEC', 20.0)      # Advanced Plan
+ETHERSCAN_BURST = env_int('ETHERSCAN_BURST', 5)
+BLOCKCYPHER_CALLS_PER_SEC = env_float('BLOCKCYPHER_CALLS_PER_SEC', 3.0)   # 3 req/sec
+BLOCKCYPHER_BURST = env_int('BLOCKCYPHER_BURST', 1)
+SOLSCAN_CALLS_PER_SEC = env_float('SOLSCAN_CALLS_PER_SEC', 16.6)        # 1000 req/60sec
+SOLSCAN_BURST = env_int('SOLSCAN_BURST', 5)
+COINGECKO_CALLS_PER_SEC = env_float('COINGECKO_CALLS_PER_SEC', 8.3)     # 500 calls/minute
+COINGECKO_BURST = env_int('COINGECKO_BURST', 5)
+RATE_LIMIT_MAX_RETRIES = 3  # 429 retries before giving the response back to the caller
+
+# Concurrent scan engine - max in-flight token scans per provider
+ETHERSCAN_CONCURRENCY = env_int('ETHERSCAN_CONCURRENCY', 4)
+BLOCKCYPHER_CONCURRENCY = env_int('BLOCKCYPHER_CONCURRENCY', 1)
+SOLSCAN_CONCURRENCY = env_int('SOLSCAN_CONCURRENCY', 1)
+
+# HTTP transport - one pooled keep-alive session per provider, sized to its parallel requests
+HTTP_CONNECT_TIMEOUT = env_float('HTTP_CONNECT_TIMEOUT', 5.0)  # Seconds - read budgets are set per call
+HTTP2_ENABLED = os.getenv('HTTP2_ENABLED', '0') == '1'  # Opt-in, needs httpx[http2] installed
+HTTP_KEEPALIVE_SECONDS = 30  # Idle HTTP/2 connections are kept this long
+HTTP_CONNECT_RETRIES = 1  # Transport-level reconnects - 429s and bad payloads are retried by the callers
+HTTP_ACCEPT_ENCODING = make_headers(accept_encoding=True)['accept-encoding']  # gzip/deflate, br/zstd when decodable
+
+# Etherscan V2 - one endpoint for every EVM chain, selected by chainid
+EVM_CHAINS = {
+    1: {'name': 'eth', 'block_seconds': 12},
+    42161: {'name': 'arbitrum', 'block_seconds': 0.25},
+    8453: {'name': 'base', 'block_seconds': 2},
+    56: {'name': 'bsc', 'block_seconds': 0.75},
+    137: {'name': 'polygon', 'block_seconds': 2},
+}
+EVM_BLOCKCHAINS = {chain['name'] for chain in EVM_CHAINS.values()}
+
+# eth_getLogs engine - Transfer logs of many contracts per call from a JSON-RPC node
+ERC20_ENGINE = os.getenv('ERC20_ENGINE', 'tokentx')  # 'tokentx' (Etherscan per contract) or 'getlogs'
+EVM_RPC_URLS = {chain_id: os.getenv(f'EVM_RPC_URL_{chain_id}') for chain_id in EVM_CHAINS if os.getenv(f'EVM_RPC_URL_{chain_id}')}
+GETLOGS_ADDRESS_BATCH = env_int('GETLOGS_ADDRESS_BATCH', 100)  # Contracts per eth_getLogs call
+GETLOGS_BLOCK_RANGE = env_int('GETLOGS_BLOCK_RANGE', 2000)  # Blocks per call - halved while the node refuses
+RPC_CALLS_PER_SEC = env_float('RPC_CALLS_PER_SEC', 10.0)
+RPC_BURST = env_int('RPC_BURST', 5)
+RPC_CONCURRENCY = env_int('RPC_CONCURRENCY', 2)
+RPC_BATCH_SIZE = 100  # Requests per JSON-RPC batch (block timestamp lookups)
+RPC_ERROR_RETRIES = 3  # eth_getLogs errors a smaller range cannot fix (rate limits, node faults) - backoff 2, 4, 8s
+RPC_RANGE_ERROR_HINTS = ('more than', 'results', 'range', 'response size', 'too large', 'too wide')  # Result caps, range limits
+ERC20_TRANSFER_TOPIC = '0xddf252ad1be2c89b69c2b068fc378daa952ba7f163c4a11628f55a4df523b3ef'
+
+# Etherscan pagination - the API caps page * offset at 10,000 results per query
+ETHERSCAN_PAGE_SIZE = env_int('ETHERSCAN_PAGE_SIZE', 1000)
+ETHERSCAN_RESULT_WINDOW = 10_000
+
+# Incremental checkpoints - first run looks back a fixed window, later runs resume
+ETH_DEFAULT_LOOKBACK_BLOCKS = 300 * 24  # ~12 seconds per block, 24-hour window = 7200 blocks
+ETH_CHECKPOINT_CHUNK_BLOCKS = env_int('ETH_CHECKPOINT_CHUNK_BLOCKS', 7200)
+ETH_MAX_CATCHUP_BLOCKS = env_int('ETH_MAX_CATCHUP_BLOCKS', 7200 * 7)  # ~7 days of downtime
+BTC_DEFAULT_LOOKBACK_BLOCKS = 25  # ~4 hours of Bitcoin blocks (sustainable for free tier)
+BTC_CHECKPOINT_CHUNK_BLOCKS = env_int('BTC_CHECKPOINT_CHUNK_BLOCKS', 6)
+BTC_MAX_CATCHUP_BLOCKS = env_int('BTC_MAX_CATCHUP_BLOCKS', 144 * 7)  # ~7 days of downtime
+# Every transaction of a block is a billed request (~3-4k per block, ~20 min at 3 req/sec), so full
+# coverage of ~144 blocks/day is not sustainable - each cycle scans this many blocks, oldest first
+BTC_MAX_BLOCKS_PER_CYCLE = env_int('BTC_MAX_BLOCKS_PER_CYCLE', 3)
+
+# Bitcoin block pagination - BlockCypher serves a block's txids in txstart/limit pages,
+# the transactions themselves come from batched /txs/{hash;hash;...} calls
+BTC_BLOCK_PAGE_SIZE = 500  # BlockCypher maximum per page
+BTC_TX_BATCH_SIZE = env_int('BTC_TX_BATCH_SIZE', 50)  # Hashes per /txs call - billed as one request each
+BTC_FETCH_WORKERS = env_int('BTC_FETCH_WORKERS', 3)  # Parallel page fetches within the rate budget
+
+# Database connection pool - shared by token loading, price lookup and writers
+DB_POOL_MIN_SIZE = env_int('DB_POOL_MIN_SIZE', 1)
+DB_POOL_MAX_SIZE = env_int('DB_POOL_MAX_SIZE', 4)
+DB_POOL_CHECK_IDLE_SECONDS = 60  # Ping connections idle longer than this before reuse
+
+# Solana watch list - parsed once, polled concurrently with per-address cursors
+SOLANA_WHALE_ADDRESSES = [addr.strip() for addr in os.getenv('SOLANA_WHALE_ADDRESSES', '').split(',') if addr.strip()]
+SOLSCAN_PAGE_SIZE = 100  # Solscan v2 page_size: 10, 20, 30, 40, 60 or 100
+SOLSCAN_MAX_PAGES = env_int('SOLSCAN_MAX_PAGES', 5)  # Per address per cycle when catching up
+SOLSCAN_FETCH_WORKERS = env_int('SOLSCAN_FETCH_WORKERS', 8)
+
+# Daemon mode - long-running service instead of one-shot cron execution
+SCANNER_MODE = os.getenv('SCANNER_MODE', 'once')  # 'once' (cron) or 'daemon'
+SCAN_INTERVAL_SECONDS = env_int('SCAN_INTERVAL_SECONDS', 24 * 3600)
+SCAN_JITTER_SECONDS = env_int('SCAN_JITTER_SECONDS', 30)
+TOKEN_REFRESH_SECONDS = env_int('TOKEN_REFRESH_SECONDS', 3600)
+SCAN_LOCK_ID = 0x5748414C45  # pg advisory lock key ('WHALE') - one scan at a time across instances, plus the shard index
+
+# Sharding - SHARD_INDEX / SHARD_COUNT (read by ScannerConfig) split the tokens across nodes
+SCANNER_WORKERS = env_int('SCANNER_WORKERS', 1)  # Shards per node, one process each
+
+# Batched database writes - rows per pipelined INSERT batch
+SAVE_BATCH_SIZE = env_int('SAVE_BATCH_SIZE', 500)
+
+# Raw payload storage - 'full' keeps the whole provider record, 'trim' keeps
+# RAW_PAYLOAD_FIELDS only, 'none' stores an empty object
+RAW_PAYLOAD_MODE = os.getenv('RAW_PAYLOAD_MODE', 'full')
+RAW_PAYLOAD_FIELDS = {
+    'eth': ('hash', 'blockNumber', 'timeStamp', 'from', 'to', 'value', 'contractAddress', 'tokenSymbol', 'tokenDecimal', 'transactionIndex'),
+    'btc': ('hash', 'block_height', 'confirmed', 'total', 'fees', 'size', 'vin_sz', 'vout_sz'),
+    'sol': ('trans_id', 'signature', 'slot', 'block_time', 'from_address', 'to_address', 'source', 'destination', 'amount', 'token_address'),
+}
+
+# On-disk response cache - settled blocks and transfer ranges never change
+RESPONSE_CACHE_PATH = os.getenv('RESPONSE_CACHE_PATH', '.cache/whale_responses.sqlite3')  # Empty disables
+RESPONSE_CACHE_MAX_MB = env_int('RESPONSE_CACHE_MAX_MB', 512)
+RESPONSE_CACHE_TTL_SECONDS = {
+    'etherscan_tokentx': 7 * 24 * 3600,
+    'blockcypher_block': 30 * 24 * 3600,
+    'blockcypher_txs': 30 * 24 * 3600,
+}
+RESPONSE_CACHE_EVICT_EVERY = 500  # Size check after this many writes
+RESPONSE_CACHE_SECRET_PARAMS = {'apikey', 'token'}  # Never part of the cache key
+ETH_CACHE_CONFIRMATIONS = 64  # ~2 epochs - ranges ending deeper than this are final (cached and checkpointed)
+BTC_CACHE_CONFIRMATIONS = 6  # Blocks this deep are final - the hashes of the newer tail are re-checked for reorgs
+
+# Dedup index - recently stored transaction IDs, kept across daemon cycles
+DEDUP_INDEX_SIZE = env_int('DEDUP_INDEX_SIZE', 200000)  # 0 disables
+
+# Token scheduling - each cycle spends its request budget on the most valuable tokens first
+SCAN_REQUEST_BUDGET = env_int('SCAN_REQUEST_BUDGET', 0)  # Requests per provider per cycle, 0 = rate limit x interval only
+DORMANT_SCAN_EVERY = env_int('DORMANT_SCAN_EVERY', 4)  # Tokens without recent whales are scanned every Nth cycle
+SCHEDULER_YIELD_DAYS = 7  # Whale history used to rank tokens
+SCHEDULER_MIN_HEADROOM = 0.1  # Floor of the budget share left after repeated 429s
+
+# Metrics - hot-path counters and latency histograms, written at the end of every cycle
+METRICS_PATH = os.getenv('METRICS_PATH', '')  # *.json for JSON, anything else Prometheus text format; empty disables
+METRICS_PREFIX = 'whale_scanner'
+METRICS_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)  # Seconds
+
+# Streaming write pipeline - fetchers block once this many records await the writer
+PIPELINE_QUEUE_SIZE = env_int('PIPELINE_QUEUE_SIZE', SAVE_BATCH_SIZE * 4)
+PIPELINE_FLUSH_SECONDS = 1.0  # Write a partial batch after this long without new records
+
+@dataclass(frozen=True)
+class ScannerConfig:
+    """Credentials and database URL - read from the environment at the entry point, not at import"""
+    database_url: str = dataclass_field(repr=False)  # Secrets never reach logs through repr()
+    etherscan_api_key: str = dataclass_field(repr=False)
+    coingecko_api_key: str = dataclass_field(repr=False)
+    kraken_api_key: str = dataclass_field(repr=False)
+    kraken_private_key: str = dataclass_field(repr=False)
+    blockcypher_api_key: str = dataclass_field(repr=False)
+    solscan_api_key: str = dataclass_field(repr=False)
+    shard_index: int = 0
+    shard_count: int = 1
+    rate_shares: dict = dataclass_field(default_factory=dict)  # Key field -> share of its rate limit this shard may use
+    
+    ENV_VARS = {
+        'database_url': 'TRINITY_DATABASE_URL',
+        'etherscan_api_key': 'ETHERSCAN_API_KEY',
+        'coingecko_api_key': 'COINGECKO_API_KEY',
+        'kraken_api_key': 'KRAKEN_API_KEY',
+        'kraken_private_key': 'KRAKEN_PRIVATE_KEY',
+        'blockcypher_api_key': 'BLOCKCYPHER_API_KEY',
+        'solscan_api_key': 'SOLSCAN_API_KEY',
+    }
+    SHARDED_KEYS = ('etherscan_api_key', 'coingecko_api_key', 'blockcypher_api_key', 'solscan_api_key')
+    OWNER_KEYS = {'blockcypher_api_key': 'btc', 'solscan_api_key': 'sol'}  # Only the shard owning the coin calls these
+    
+    @classmethod
+    def from_env(cls, environ=None, shard_index=None, shard_count=None):
+        """Load every required variable, raising ValueError for the first one missing
+        
+        Provider keys may be comma-separated lists: shard i uses key i mod n,
+        and shards that end up on the same key split its rate limit evenly.
+        BlockCypher and Solscan are only called by the shard that owns btc or
+        sol, so that shard keeps its key's full rate limit.
+        """
+        environ = os.environ if environ is None else environ
+        shard_index = int(environ.get('SHARD_INDEX', '0')) if shard_index is None else shard_index
+        shard_count = int(environ.get('SHARD_COUNT', '1')) if shard_count is None else shard_count
+        if shard_count < 1:
+            raise ValueError(f"❌ SHARD_COUNT must be at least 1, got {shard_count}")
+        if not 0 <= shard_index < shard_count:
+            raise ValueError(f"❌ SHARD_INDEX must be between 0 and SHARD_COUNT - 1 ({shard_count - 1}), got {shard_index}")
+        
+        values = {}
+        rate_shares = {'evm_rpc': 1 / shard_count}  # One node per chain, shared by every shard
+        for attr, name in cls.ENV_VARS.items():
+            value = environ.get(name, '')
+            if attr in cls.SHARDED_KEYS:
+                keys = [key.strip() for key in value.split(',') if key.strip()]
+                slot = shard_index % len(keys) if keys else 0
+                value = keys[slot] if keys else ''
+                if attr in cls.OWNER_KEYS:
+                    rate_shares[attr] = 1.0
+                else:
+                    rate_shares[attr] = 1 / len(range(slot, shard_count, max(1, len(keys))))
+            if not value:
+                raise ValueError(f"❌ {name} environment variable is required")
+            values[attr] = value
+        return cls(**values, shard_index=shard_index, shard_count=shard_count, rate_shares=rate_shares)
+    
+    def rate_limit(self, attr, calls_per_sec, burst):
+        """(calls_per_sec, burst) for this shard's share of a provider limit"""
+        share = self.rate_shares.get(attr, 1.0)
+        return calls_per_sec * share, max(1, round(burst * share))
+
+def configure_logging(level=logging.INFO):
+    """Line-buffered stdout logging for Render - called by entry points, never on import"""
+    sys.stdout.reconfigure(line_buffering=True)
+    sys.stderr.reconfigure(line_buffering=True)
+    logging.basicConfig(
+        level=level,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        handlers=[logging.StreamHandler(sys.stdout)],
+        force=True
+    )
+
+RESPONSE_CACHE_SCHEMA_SQL = """
+    CREATE TABLE IF NOT EXISTS http_responses (
+        key TEXT PRIMARY KEY,
+        endpoint TEXT NOT NULL,
+        body BLOB NOT NULL,
+        size INTEGER NOT NULL,
+        expires_at REAL NOT NULL,
+        accessed_at REAL NOT NULL
+    );
+"""
+
+RECENT_TRANSACTION_IDS_SQL = """
+    SELECT transaction_id FROM whale_transactions
+    ORDER BY block_timestamp DESC
+    LIMIT %(limit)s;
+"""
+
+WHALE_YIELD_SQL = """
+    SELECT coin_symbol, count(*) FROM whale_transactions
+    WHERE block_timestamp >= %(since)s
+    GROUP BY coin_symbol;
+"""
+
+TOKENS_SELECT_SQL = """
+    SELECT symbol, coin_id, ethereum_contract_address, contract_decimals, chain_id
+    FROM supported_symbols 
+    WHERE is_active = true 
+    ORDER BY priority DESC
+"""
+
+# Before migration 004 - all contracts on Ethereum mainnet
+TOKENS_FALLBACK_SQL = """
+    SELECT symbol, coin_id, ethereum_contract_address, contract_decimals, 1
+    FROM supported_symbols 
+    WHERE is_active = true 
+    ORDER BY priority DESC
+"""
+
+CHECKPOINT_SELECT_SQL = """
+    SELECT scope, last_block FROM scanner_checkpoints;
+"""
+
+CHECKPOINT_UPSERT_SQL = """
+    INSERT INTO scanner_checkpoints (scope, last_block, updated_at)
+    VALUES (%(scope)s, %(last_block)s, now())
+    ON CONFLICT (scope) DO UPDATE
+    SET last_block = GREATEST(scanner_checkpoints.last_block, EXCLUDED.last_block),
+        updated_at = EXCLUDED.updated_at;
+"""
+
+BLOCK_HASHES_SELECT_SQL = """
+    SELECT height, block_hash FROM scanner_block_hashes
+    WHERE scope = %(scope)s AND height > %(above)s AND height <= %(through)s
+    ORDER BY height;
+"""
+
+BLOCK_HASH_UPSERT_SQL = """
+    INSERT INTO scanner_block_hashes (scope, height, block_hash, updated_at)
+    VALUES (%(scope)s, %(height)s, %(block_hash)s, now())
+    ON CONFLICT (scope, height) DO UPDATE
+    SET block_hash = EXCLUDED.block_hash,
+        updated_at = EXCLUDED.updated_at;
+"""
+
+BLOCK_HASHES_PRUNE_SQL = """
+    DELETE FROM scanner_block_hashes WHERE scope = %(scope)s AND height <= %(below)s;
+"""
+
+LATEST_PRICES_SELECT_SQL = """
+    SELECT coin_symbol, price_per_token FROM token_latest_prices;
+"""
+
+# Legacy path - full scan and sort of whale_transactions, used until migration 002 is applied
+LATEST_PRICES_FALLBACK_SQL = """
+    SELECT DISTINCT ON (coin_symbol) coin_symbol, 
+           FIRST_VALUE(price_per_token) OVER (
+               PARTITION BY coin_symbol 
+               ORDER BY block_timestamp DESC
+           ) as current_price
+    FROM whale_transactions 
+    WHERE price_per_token > 0
+    ORDER BY coin_symbol, block_timestamp DESC
+"""
+
+LATEST_PRICE_UPSERT_SQL = """
+    INSERT INTO token_latest_prices (coin_symbol, price_per_token, block_timestamp, updated_at)
+    VALUES (%(coin_symbol)s, %(price_per_token)s, %(block_timestamp)s, now())
+    ON CONFLICT (coin_symbol) DO UPDATE
+    SET price_per_token = EXCLUDED.price_per_token,
+        block_timestamp = EXCLUDED.block_timestamp,
+        updated_at = EXCLUDED.updated_at
+    WHERE EXCLUDED.block_timestamp >= token_latest_prices.block_timestamp;
+"""
+
+WALLET_BATCH_INSERT_SQL = """
+    INSERT INTO wallet_accounts (wallet_address)
+    SELECT unnest(%(wallet_addresses)s::text[])
+    ON CONFLICT (wallet_address) DO NOTHING;
+"""
+
+WALLET_INSERT_SQL = """
+    INSERT INTO wallet_accounts (wallet_address) 
+    VALUES (%(wallet_address)s) 
+    ON CONFLICT (wallet_address) DO NOTHING;
+"""
+
+# RETURNING only yields a row when the insert happened, so duplicates are countable
+# Positional parameters - WhaleTransaction.as_row() order
+WHALE_TRANSACTION_INSERT_SQL = """
+    INSERT INTO whale_transactions (
+        transaction_id, wallet_address, blockchain, block_number, block_timestamp,
+        transaction_index, from_address, to_address, gas_used, gas_price,
+        coin_symbol, coin_contract, coin_decimals, activity_type, amount_tokens,
+        amount_usd, price_per_token, raw_transaction, data_source, processed_at
+    ) VALUES (
+        %s, %s, %s, %s, %s,
+        %s, %s, %s, %s, %s,
+        %s, %s, %s, %s, %s,
+        %s, %s, %s, %s, %s
+    )
+    ON CONFLICT (transaction_id) DO NOTHING
+    RETURNING transaction_id;
+"""
+
+@dataclass(slots=True)
+class WhaleTransaction:
+    """One whale_transactions row - fields match the INSERT column list"""
+    transaction_id: str
+    wallet_address: str
+    blockchain: str
+    block_number: int | None
+    block_timestamp: datetime
+    transaction_index: int | None
+    from_address: str | None
+    to_address: str | None
+    gas_used: int | None
+    gas_price: int | None
+    coin_symbol: str
+    coin_contract: str | None
+    coin_decimals: int
+    activity_type: str
+    amount_tokens: Decimal
+    amount_usd: Decimal
+    price_per_token: float
+    raw_transaction: str
+    data_source: str
+    processed_at: datetime
+    
+    def as_row(self):
+        """Parameters for WHALE_TRANSACTION_INSERT_SQL"""
+        return (
+            self.transaction_id, self.wallet_address, self.blockchain, self.block_number, self.block_timestamp,
+            self.transaction_index, self.from_address, self.to_address, self.gas_used, self.gas_price,
+            self.coin_symbol, self.coin_contract, self.coin_decimals, self.activity_type, self.amount_tokens,
+            self.amount_usd, self.price_per_token, self.raw_transaction, self.data_source, self.processed_at,
+        )
+
+class DatabasePool:
+    """Thread-safe pool of long-lived psycopg connections
+    
+    Connections are opened lazily up to max_size and handed out LIFO so the
+    warm ones get reused. A connection that is closed, broken or fails a
+    SELECT 1 after sitting idle is replaced instead of being returned.
+    """
+    
+    def __init__(self, conninfo, min_size=DB_POOL_MIN_SIZE, max_size=DB_POOL_MAX_SIZE):
+        self.conninfo = conninfo
+        self.max_size = max_size
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._closed = False
+        
+        for _ in range(min(min_size, max_size)):
+            self._idle.put((self._connect(), time.monotonic()))
+    
+    def _connect(self):
+        conn = psycopg.connect(self.conninfo)
+        conn.autocommit = False  # Enable transaction control
+        return conn
+    
+    def _is_healthy(self, conn, idle_since):
+        if conn.closed or conn.broken:
+            return False
+        if time.monotonic() - idle_since < DB_POOL_CHECK_IDLE_SECONDS:
+            return True
+        try:
+            conn.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except Exception:
+            return False
+    
+    def _checkout(self):
+        while True:
+            try:
+                conn, idle_since = self._idle.get_nowait()
+            except queue.Empty:
+                return self._connect()
+            
+            if self._is_healthy(conn, idle_since):
+                return conn
+            
+            logger.warning(f"{SCANNER_NAME} dropping unhealthy pooled database connection")
+            self._discard(conn)
+    
+    def _discard(self, conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+    
+    @contextmanager
+    def connection(self):
+        """Borrow a connection; any open transaction is rolled back on return"""
+        if self._closed:
+            raise Exception("❌ ERROR: database pool is closed")
+        
+        self._slots.acquire()
+        conn = None
+        try:
+            conn = self._checkout()
+            yield conn
+        finally:
+            if conn is not None:
+                self._checkin(conn)
+            self._slots.release()
+    
+    def _checkin(self, conn):
+        try:
+            if not conn.closed and conn.info.transaction_status != TransactionStatus.IDLE:
+                conn.rollback()
+        except Exception:
+            pass
+        
+        if self._closed or conn.closed or conn.broken:
+            self._discard(conn)
+        else:
+            self._idle.put((conn, time.monotonic()))
+    
+    def close(self):
+        """Close every idle connection and refuse further checkouts"""
+        self._closed = True
+        while True:
+            try:
+                conn, _ = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(conn)
+
+class ResponseCache:
+    """SQLite store of settled API responses, keyed by endpoint and request
+    
+    Entries expire after their endpoint's TTL, and once the stored bodies pass
+    max_bytes the least recently used entries are evicted. Callers decide what
+    is cacheable - nothing near the chain head is ever stored. Errors degrade
+    to cache misses so the cache can never fail a scan.
+    """
+    
+    def __init__(self, path, max_bytes=RESPONSE_CACHE_MAX_MB * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._writes = 0
+        
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        
+        # One connection shared by the fetch threads, serialized by the lock
+        self._conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(RESPONSE_CACHE_SCHEMA_SQL)
+    
+    @staticmethod
+    def request_key(endpoint, url, params):
+        """Stable key for a request - credentials excluded so key rotation keeps the cache"""
+        request = sorted((name, str(value)) for name, value in (params or {}).items()
+                         if name not in RESPONSE_CACHE_SECRET_PARAMS)
+        return hashlib.sha256(json.dumps([endpoint, url, request]).encode()).hexdigest()
+    
+    def get(self, endpoint, url, params):
+        """Stored response body, or None if missing or expired"""
+        key = self.request_key(endpoint, url, params)
+        now = time.time()
+        
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT body FROM http_responses WHERE key = ? AND expires_at > ?", (key, now)
+                ).fetchone()
+                if row is not None:
+                    self._conn.execute("UPDATE http_responses SET accessed_at = ? WHERE key = ?", (now, key))
+        except sqlite3.Error as e:
+            logger.debug(f"{SCANNER_NAME} response cache read failed: {e}")
+            return None
+        
+        METRICS.inc('response_cache_lookups_total', endpoint=endpoint, result='hit' if row is not None else 'miss')
+        return bytes(row[0]) if row is not None else None
+    
+    def put(self, endpoint, url, params, body):
+        """Store a response body for the endpoint's TTL"""
+        key = self.request_key(endpoint, url, params)
+        now = time.time()
+        
+        try:
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO http_responses (key, endpoint, body, size, expires_at, accessed_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, endpoint, body, len(body), now + RESPONSE_CACHE_TTL_SECONDS[endpoint], now)
+                )
+                self._writes += 1
+                if self._writes % RESPONSE_CACHE_EVICT_EVERY == 0:
+                    self._evict(now)
+        except sqlite3.Error as e:
+            logger.debug(f"{SCANNER_NAME} response cache write failed: {e}")
+    
+    def _evict(self, now):
+        self._conn.execute("DELETE FROM http_responses WHERE expires_at <= ?", (now,))
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM http_responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        
+        # Drop least recently used entries down to 90% of the budget
+        excess = total - int(self.max_bytes * 0.9)
+        stale = []
+        for key, size in self._conn.execute("SELECT key, size FROM http_responses ORDER BY accessed_at"):
+            stale.append((key,))
+            excess -= size
+            if excess <= 0:
+                break
+        self._conn.executemany("DELETE FROM http_responses WHERE key = ?", stale)
+        logger.info(f"🧹 {SCANNER_NAME} response cache evicted {len(stale)} entries")
+    
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+class ScannerMetrics:
+    """Process-wide counters, gauges and latency histograms for the hot paths
+    
+    Recording is a dict update under one lock, cheap enough for every HTTP
+    call, page and database write. Values accumulate for the life of the
+    process like any Prometheus counter; export() writes them out as a
+    Prometheus text file (node_exporter textfile collector) or as JSON.
+    """
+    
+    def __init__(self, buckets=METRICS_LATENCY_BUCKETS, prefix=METRICS_PREFIX):
+        self.buckets = tuple(buckets)
+        self.prefix = prefix
+        self._counters = {}    # (name, labels) -> value
+        self._gauges = {}      # (name, labels) -> value
+        self._histograms = {}  # (name, labels) -> [count per bucket..., +Inf count, sum]
+        self.labels = {}  # Added to every exported series, e.g. shard
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def _key(name, labels):
+        return name, tuple(sorted((label, str(value)) for label, value in labels.items()))
+    
+    def inc(self, name, amount=1, **labels):
+        """Add amount to a counter"""
+        key = self._key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+    
+    def set(self, name, value, **labels):
+        """Set a gauge"""
+        key = self._key(name, labels)
+        with self._lock:
+            self._gauges[key] = value
+    
+    def observe(self, name, seconds, **labels):
+        """Record one duration in a histogram"""
+        key = self._key(name, labels)
+        index = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            histogram[index] += 1
+            histogram[-1] += seconds
+    
+    @contextmanager
+    def timer(self, name, **labels):
+        """Observe the duration of the with-block, also when it raises"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+    
+    def snapshot(self):
+        """JSON-ready copy of every metric - histogram buckets hold per-bucket counts"""
+        with self._lock:
+            counters = dict(self._counters)
+            gauges = dict(self._gauges)
+            histograms = {key: list(values) for key, values in self._histograms.items()}
+        
+        snapshot = {'generated_at': time.time(), 'counters': [], 'gauges': [], 'histograms': []}
+        for kind, values in (('counters', counters), ('gauges', gauges)):
+            for (name, labels), value in sorted(values.items()):
+                snapshot[kind].append({'name': name, 'labels': {**self.labels, **dict(labels)}, 'value': value})
+        
+        for (name, labels), values in sorted(histograms.items()):
+            counts = values[:-1]
+            snapshot['histograms'].append({
+                'name': name,
+                'labels': {**self.labels, **dict(labels)},
+                'buckets': dict(zip([str(bound) for bound in self.buckets] + ['+Inf'], counts)),
+                'count': sum(counts),
+                'sum': values[-1],
+            })
+        return snapshot
+    
+    def to_prometheus(self):
+        """Prometheus text exposition format - histogram buckets are cumulative"""
+        def series(name, labels, extra=()):
+            pairs = list(labels.items()) + list(extra)
+            if not pairs:
+                return f"{self.prefix}_{name}"
+            escaped = ','.join(
+                f'{label}="' + str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') + '"'
+                for label, value in pairs
+            )
+            return f"{self.prefix}_{name}{{{escaped}}}"
+        
+        snapshot = self.snapshot()
+        lines = []
+        typed = set()
+        
+        for kind, metric_type in (('counters', 'counter'), ('gauges', 'gauge'), ('histograms', 'histogram')):
+            for metric in snapshot[kind]:
+                name = metric['name']
+                if name not in typed:
+                    typed.add(name)
+                    lines.append(f"# TYPE {self.prefix}_{name} {metric_type}")
+                
+                if kind != 'histograms':
+                    lines.append(f"{series(name, metric['labels'])} {metric['value']}")
+                    continue
+                
+                cumulative = 0
+                for bound, count in metric['buckets'].items():
+                    cumulative += count
+                    lines.append(f"{series(name + '_bucket', metric['labels'], [('le', bound)])} {cumulative}")
+                lines.append(f"{series(name + '_sum', metric['labels'])} {metric['sum']}")
+                lines.append(f"{series(name + '_count', metric['labels'])} {metric['count']}")
+        
+        return '\n'.join(lines) + '\n'
+    
+    def export(self, path):
+        """Atomically write every metric to path - JSON for *.json, Prometheus text otherwise"""
+        body = json.dumps(self.snapshot(), indent=2) if path.endswith('.json') else self.to_prometheus()
+        
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        
+        # Scrapers never see a half-written file
+        temp_path = f"{path}.tmp"
+        with open(temp_path, 'w') as f:
+            f.write(body)
+        os.replace(temp_path, path)
+    
+    def endpoint_summary(self):
+        """Per-endpoint (requests, errors, 429s, mean latency seconds, rate-limit wait seconds)"""
+        snapshot = self.snapshot()
+        summary = {}
+        
+        def row(endpoint):
+            return summary.setdefault(endpoint, [0, 0, 0, 0.0, 0.0])
+        
+        for metric in snapshot['counters']:
+            endpoint = metric['labels'].get('endpoint')
+            if metric['name'] == 'http_responses_total' and metric['labels'].get('status') == '429':
+                row(endpoint)[2] += metric['value']
+            elif metric['name'] == 'http_errors_total':
+                row(endpoint)[1] += metric['value']
+        
+        for metric in snapshot['histograms']:
+            endpoint = metric['labels'].get('endpoint')
+            if metric['name'] == 'http_request_seconds':
+                row(endpoint)[0] = metric['count']
+                row(endpoint)[3] = metric['sum'] / max(1, metric['count'])
+            elif metric['name'] == 'rate_limit_wait_seconds':
+                row(endpoint)[4] = metric['sum']
+        
+        return {endpoint: tuple(values) for endpoint, values in sorted(summary.items())}
+
+METRICS = ScannerMetrics()
+
+class TokenBucketRateLimiter:
+    """Thread-safe token bucket shared by every scan worker using one API client
+    
+    Tokens refill continuously at `rate` per second up to `burst`, so the budget is
+    measured from the time of the previous request rather than added on top of
+    response latency. A 429 / Retry-After pauses the whole bucket.
+    """
+    
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self.requests = 0   # Tokens handed out - the scheduler's request budget reads this
+        self.throttled = 0  # Pauses requested by the provider (429s)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+    
+    def acquire(self, cost=1):
+        """Block until a request token is available
+        
+        A call the provider bills as several requests takes cost tokens. A
+        cost above the burst goes into debt, which later callers wait out.
+        """
+        need = min(cost, self.capacity)
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    wait = self._paused_until - now
+                else:
+                    elapsed = now - self._updated
+                    self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+                    self._updated = now
+                    if self._tokens >= need:
+                        self._tokens -= cost
+                        self.requests += cost
+                        return
+                    wait = (need - self._tokens) / self.rate
+            time.sleep(wait)
+    
+    def pause(self, seconds):
+        """Stop handing out tokens for `seconds` (provider asked us to back off)"""
+        with self._lock:
+            self.throttled += 1
+            resume_at = time.monotonic() + seconds
+            if resume_at > self._paused_until:
+                self._paused_until = resume_at
+                self._updated = resume_at  # No refill while paused
+                self._tokens = 0.0
+
+def dump_json(value):
+    """Encode value as a JSON string - orjson when installed"""
+    if orjson is not None:
+        try:
+            return orjson.dumps(value).decode()
+        except TypeError:
+            pass  # e.g. integers beyond 64 bits - the stdlib handles those
+    return json.dumps(value)
+
+def evm_blocks(chain_id, mainnet_blocks):
+    """Scale a mainnet block count to the same wall-clock span on another EVM chain"""
+    return int(mainnet_blocks * EVM_CHAINS[1]['block_seconds'] / EVM_CHAINS[chain_id]['block_seconds'])
+
+def shard_of(key, shard_count):
+    """Shard owning key - rendezvous hashing, so resizing only moves the keys of added or removed shards"""
+    if shard_count <= 1:
+        return 0
+    return max(range(shard_count), key=lambda shard: hashlib.blake2b(f"{shard}:{key}".encode(), digest_size=8).digest())
+
+def token_shard_key(symbol, token_info):
+    """Sharding key of a token - the contract's checkpoint scope, or the native symbol"""
+    if token_info.get('address'):
+        return evm_scope(token_info['address'], token_info.get('chain_id', 1))
+    return symbol.lower()
+
+def scope_shard_key(scope):
+    """Sharding key of a checkpoint scope - Solana address cursors belong to SOL"""
+    if scope.startswith('sol:'):
+        return 'sol'
+    return scope
+
+def shard_path(path, shard_index, shard_count):
+    """Per-shard file path (whale.json -> whale.shard-2.json), unchanged when not sharded"""
+    if shard_count <= 1 or not path:
+        return path
+    root, ext = os.path.splitext(path)
+    return f"{root}.shard-{shard_index}{ext}"
+
+def evm_scope(contract_address, chain_id):
+    """Checkpoint scope of a contract - mainnet keeps the original eth:<contract> form"""
+    if chain_id == 1:
+        return f"eth:{contract_address.lower()}"
+    return f"eth:{chain_id}:{contract_address.lower()}"
+
+def decode_json(body):
+    """Decode JSON bytes - orjson when installed"""
+    with METRICS.timer('json_decode_seconds'):
+        if orjson is not None:
+            try:
+                return orjson.loads(body)
+            except ValueError:
+                pass  # Let the stdlib decoder raise its usual error
+        return json.loads(body)
+
+def load_json(response):
+    """Decode a JSON response body - orjson when installed"""
+    with METRICS.timer('json_decode_seconds'):
+        if orjson is not None:
+            try:
+                return orjson.loads(response.content)
+            except ValueError:
+                pass  # Let the stdlib decoder raise its usual error
+        return response.json()
+
+def raw_payload(blockchain, record):
+    """raw_transaction value for a provider record according to RAW_PAYLOAD_MODE"""
+    if RAW_PAYLOAD_MODE == 'none':
+        return '{}'
+    if RAW_PAYLOAD_MODE == 'trim':
+        record = {field: record[field] for field in RAW_PAYLOAD_FIELDS[blockchain] if field in record}
+    return dump_json(record)
+
+@lru_cache(maxsize=4096)
+def raw_whale_window(decimals, token_price):
+    """(min_raw, max_raw) on-chain integer amounts spanning the whale USD window
+    
+    Computed exactly once per token decimals and price - i.e. per token and
+    run - so each transfer needs only integer comparisons. None without a price.
+    """
+    if token_price <= 0:
+        return None
+    
+    scale = Decimal(10) ** decimals
+    price = Decimal(str(token_price))
+    min_raw = AMOUNT_CONTEXT.divide(WHALE_THRESHOLD_USD * scale, price).to_integral_value(ROUND_CEILING)
+    max_raw = AMOUNT_CONTEXT.divide(MAX_USD_AMOUNT * scale, price).to_integral_value(ROUND_FLOOR)
+    return int(min_raw), int(max_raw)
+
+def in_whale_window(raw_amount, window):
+    """True if an integer raw amount lies inside a raw_whale_window"""
+    return window is not None and window[0] <= raw_amount <= window[1]
+
+def select_whale_transfers(transfers, window):
+    """Transfers of one page whose raw value lies inside the whale window
+    
+    Values are compared as exact integers; the digit count rejects most
+    transfers before any parsing.
+    """
+    if window is None:
+        return []
+    
+    min_raw, max_raw = window
+    min_digits, max_digits = len(str(min_raw)), len(str(max_raw))
+    selected = []
+    
+    for transfer in transfers:
+        value = transfer.get('value') or ''
+        if not min_digits <= len(value) <= max_digits:
+            continue
+        try:
+            raw_amount = int(value)
+        except ValueError:
+            continue
+        if min_raw <= raw_amount <= max_raw:
+            selected.append(transfer)
+    
+    return selected
+
+def token_amounts(raw_amount, decimals, token_price):
+    """Exact (amount_tokens, amount_usd) Decimals for a raw on-chain amount"""
+    amount_tokens = Decimal(raw_amount).scaleb(-decimals, AMOUNT_CONTEXT)
+    amount_usd = AMOUNT_CONTEXT.multiply(amount_tokens, Decimal(str(token_price)))
+    return amount_tokens, amount_usd.quantize(USD_CENTS, context=AMOUNT_CONTEXT)
+
+def parse_retry_after(value, default):
+    """Parse a Retry-After header (delta-seconds or HTTP date) into seconds"""
+    if not value:
+        return default
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+        return max(0.0, retry_at.timestamp() - time.time())
+    except (TypeError, ValueError):
+        return default
 
-# Test log - this should appear in Render logs
-logger.info(f"🚀 {SCANNER_NAME} DEPLOYMENT STARTING")
-logger.info(f"⏰ Execution time: {datetime.utcnow()}")
+def create_http_session(pool_size=1, headers=None):
+    """Keep-alive session for one provider, asking for compressed responses
+    
+    The connection pool holds pool_size connections - the provider's
+    parallel requests - so none is opened just to be discarded. With
+    httpx[http2] installed (and HTTP2_ENABLED) an HTTP/2 httpx.Client is
+    returned instead; it serves get/post/headers the same way.
+    """
+    headers = {'Accept-Encoding': HTTP_ACCEPT_ENCODING, **(headers or {})}
+    
+    if HTTP2_ENABLED and httpx is not None:
+        limits = httpx.Limits(
+            max_connections=pool_size, max_keepalive_connections=pool_size, keepalive_expiry=HTTP_KEEPALIVE_SECONDS
+        )
+        transport = httpx.HTTPTransport(http2=True, limits=limits, retries=HTTP_CONNECT_RETRIES)
+        return httpx.Client(transport=transport, headers=headers, follow_redirects=True)
+    
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_maxsize=pool_size,
+        max_retries=Retry(  # Connect failures only - 429s and Retry-After belong to rate_limited_request
+            total=HTTP_CONNECT_RETRIES, connect=HTTP_CONNECT_RETRIES, read=False, status=0, other=0,
+            respect_retry_after_header=False, backoff_factor=0.2,
+        ),
+    )
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers.update(headers)
+    return session
+
+def http_timeout(session, read_timeout):
+    """(connect, read) timeout budget in the form the session expects"""
+    if httpx is not None and isinstance(session, httpx.Client):
+        return httpx.Timeout(read_timeout, connect=HTTP_CONNECT_TIMEOUT)
+    return HTTP_CONNECT_TIMEOUT, read_timeout
+
+def rate_limited_request(send, rate_limiter, url, endpoint, cost=1):
+    """Call send() through a token bucket, honouring 429 responses and Retry-After
+    
+    Time spent waiting for the bucket and time on the wire are recorded
+    separately under endpoint, along with every response status. cost is
+    the number of requests the provider bills for the call.
+    """
+    for attempt in range(RATE_LIMIT_MAX_RETRIES + 1):
+        with METRICS.timer('rate_limit_wait_seconds', endpoint=endpoint):
+            rate_limiter.acquire(cost)
+        
+        try:
+            with METRICS.timer('http_request_seconds', endpoint=endpoint):
+                response = send()
+        except Exception:
+            METRICS.inc('http_errors_total', endpoint=endpoint)
+            raise
+        
+        METRICS.inc('http_responses_total', endpoint=endpoint, status=response.status_code)
+        if response.status_code != 429:
+            return response
+        
+        retry_after = parse_retry_after(response.headers.get('Retry-After'), default=2 ** attempt)
+        logger.warning(f"{SCANNER_NAME} HTTP 429 from {url.split('?')[0]} - backing off {retry_after:.1f}s")
+        rate_limiter.pause(retry_after)
+        if attempt < RATE_LIMIT_MAX_RETRIES:
+            METRICS.inc('http_retries_total', endpoint=endpoint, reason='429')
+    
+    return response
+
+def rate_limited_get(session, rate_limiter, url, params=None, timeout=30, endpoint=None, cost=1):
+    """GET through a token bucket - timeout is the read budget, endpoint labels the metrics (default: host)"""
+    timeout = http_timeout(session, timeout)
+    return rate_limited_request(
+        lambda: session.get(url, params=params, timeout=timeout), rate_limiter, url, endpoint or urlsplit(url).netloc, cost
+    )
+
+def rate_limited_post(session, rate_limiter, url, payload, timeout=30, endpoint=None):
+    """POST a JSON body through a token bucket - timeout is the read budget, endpoint labels the metrics (default: host)"""
+    timeout = http_timeout(session, timeout)
+    return rate_limited_request(
+        lambda: session.post(url, json=payload, timeout=timeout), rate_limiter, url, endpoint or urlsplit(url).netloc
+    )
+
+def decode_transfer_log(log):
+    """tokentx-shaped transfer dict from an ERC-20 Transfer log"""
+    topics = log['topics']
+    return {
+        'hash': log.get('transactionHash'),
+        'from': '0x' + topics[1][-40:],
+        'to': '0x' + topics[2][-40:],
+        'value': str(int(log.get('data', '0x')[2:66] or '0', 16)),
+        'contractAddress': log.get('address', '').lower(),
+        'blockNumber': str(int(log['blockNumber'], 16)),
+        'transactionIndex': str(int(log.get('transactionIndex') or '0x0', 16)),
+        'logIndex': str(int(log.get('logIndex') or '0x0', 16)),
+        'timeStamp': str(int(log['blockTimestamp'], 16)) if log.get('blockTimestamp') else None,
+    }
+
+class EvmRpcAPI:
+    """JSON-RPC node client for address-batched ERC-20 Transfer log scans"""
+    
+    def __init__(self, url, chain_id, calls_per_sec=RPC_CALLS_PER_SEC, burst=RPC_BURST):
+        self.url = url
+        self.chain_id = chain_id
+        self.session = create_http_session(RPC_CONCURRENCY)
+        self.rate_limiter = TokenBucketRateLimiter(calls_per_sec, burst)
+        self.scanner_name = SCANNER_NAME
+    
+    def call(self, payload, timeout=60):
+        """Send one JSON-RPC request or batch, returns the decoded response - raises on transport failure"""
+        for attempt in range(3):
+            try:
+                response = rate_limited_post(
+                    self.session, self.rate_limiter, self.url, payload, timeout=timeout,
+                    endpoint=f"rpc_{EVM_CHAINS[self.chain_id]['name']}",
+                )
+                if response.status_code == 200:
+                    return load_json(response)
+                logger.warning(f"{self.scanner_name} {EVM_CHAINS[self.chain_id]['name']} RPC HTTP {response.status_code} - attempt {attempt + 1}")
+                
+            except Exception as e:
+                logger.warning(f"{self.scanner_name} {EVM_CHAINS[self.chain_id]['name']} RPC request failed (attempt {attempt + 1}): {e}")
+            
+            # Backoff before retry
+            if attempt < 2:
+                METRICS.inc('http_retries_total', endpoint=f"rpc_{EVM_CHAINS[self.chain_id]['name']}", reason='error')
+                METRICS.inc('backoff_seconds_total', 0.5 * (attempt + 1), endpoint=f"rpc_{EVM_CHAINS[self.chain_id]['name']}")
+                time.sleep(0.5 * (attempt + 1))
+        
+        raise Exception(f"{EVM_CHAINS[self.chain_id]['name']} RPC unavailable")
+    
+    def get_latest_block(self):
+        """Head block as seen by this node"""
+        data = self.call({'jsonrpc': '2.0', 'id': 1, 'method': 'eth_blockNumber', 'params': []})
+        return int(data['result'], 16)
+    
+    def iter_transfer_logs(self, addresses, from_block, to_block):
+        """Yield Transfer logs of the given contracts in from_block..to_block, one list per sub-range
+        
+        Ranges the node refuses (too many results, range too wide) are halved
+        until they fit; raises if a single block is still refused. Any other
+        error (rate limit, quota, node fault) pauses the bucket and retries
+        the same range, raising after RPC_ERROR_RETRIES.
+        """
+        ranges = [(from_block, to_block)]
+        failures = 0
+        
+        while ranges:
+            start, end = ranges.pop()
+            data = self.call({
+                'jsonrpc': '2.0', 'id': 1, 'method': 'eth_getLogs',
+                'params': [{
+                    'address': addresses,
+                    'topics': [ERC20_TRANSFER_TOPIC],
+                    'fromBlock': hex(start),
+                    'toBlock': hex(end),
+                }],
+            })
+            
+            if 'error' not in data:
+                failures = 0
+                yield data.get('result') or []
+                continue
+            
+            error = data['error']
+            message = str(error.get('message', error) if isinstance(error, dict) else error)
+            
+            if not any(hint in message.lower() for hint in RPC_RANGE_ERROR_HINTS):
+                # A smaller range does not help - back off and retry the same one
+                if failures >= RPC_ERROR_RETRIES:
+                    raise Exception(f"eth_getLogs blocks {start:,}-{end:,} failed: {message}")
+                failures += 1
+                endpoint = f"rpc_{EVM_CHAINS[self.chain_id]['name']}"
+                METRICS.inc('http_retries_total', endpoint=endpoint, reason='rpc_error')
+                METRICS.inc('backoff_seconds_total', 2 ** failures, endpoint=endpoint)
+                logger.warning(f"{self.scanner_name} {EVM_CHAINS[self.chain_id]['name']} eth_getLogs error ({message}) - backing off {2 ** failures}s")
+                self.rate_limiter.pause(2 ** failures)
+                ranges.append((start, end))
+                continue
+            
+            if start == end:
+                raise Exception(f"eth_getLogs refused block {start:,}: {message}")
+            
+            # Oldest half first - pop() takes from the end
+            middle = (start + end) // 2
+            ranges.extend([(middle + 1, end), (start, middle)])
+    
+    def get_block_timestamps(self, block_numbers):
+        """Unix timestamps of the given blocks via batched eth_getBlockByNumber"""
+        block_numbers = sorted(block_numbers)
+        timestamps = {}
+        
+        for i in range(0, len(block_numbers), RPC_BATCH_SIZE):
+            batch = block_numbers[i:i + RPC_BATCH_SIZE]
+            responses = self.call([
+                {'jsonrpc': '2.0', 'id': n, 'method': 'eth_getBlockByNumber', 'params': [hex(n), False]}
+                for n in batch
+            ])
+            for item in responses:
+                block = item.get('result')
+                if block:
+                    timestamps[item['id']] = int(block['timestamp'], 16)
+        
+        missing = set(block_numbers) - set(timestamps)
+        if missing:
+            raise Exception(f"no timestamp for {len(missing)} blocks (first {min(missing):,})")
+        return timestamps
 
 class EtherscanAPI:
-    """Etherscan API with enhanced rate limiting for 20 calls/sec Advanced Plan"""
+    """Etherscan API with token-bucket rate limiting for 20 calls/sec Advanced Plan"""
     
-    def __init__(self, api_key, delay=ETHERSCAN_DELAY):
+    def __init__(self, api_key, calls_per_sec=ETHERSCAN_CALLS_PER_SEC, burst=ETHERSCAN_BURST, cache=None):
         self.api_key = api_key
-        self.delay = delay
-        self.base_url = "https://api.etherscan.io/api"
-        self.session = requests.Session()
+        self.base_url = "https://api.etherscan.io/v2/api"
+        self.session = create_http_session(max(ETHERSCAN_CONCURRENCY, len(EVM_CHAINS)))  # Chain heads are fetched in parallel
+        self.rate_limiter = TokenBucketRateLimiter(calls_per_sec, burst)  # One key - shared by all chains
+        self.cache = cache
+        self.latest_blocks = {}  # chain_id -> head from the last get_latest_block
         self.scanner_name = SCANNER_NAME
     
-    def get_latest_block(self):
-        """Get latest block with fallbacks"""
+    def get_latest_block(self, chain_id=1):
+        """Get latest block of an EVM chain"""
         try:
             # Method 1: Direct API call
             params = {
+                'chainid': chain_id,
                 'module': 'proxy',
                 'action': 'eth_blockNumber',
                 'apikey': self.api_key
             }
             
-            time.sleep(self.delay)
-            response = self.session.get(self.base_url, params=params, timeout=30)
+            response = rate_limited_get(
+                self.session, self.rate_limiter, self.base_url, params, timeout=30, endpoint='etherscan_blocknumber'
+            )
             
             if response.status_code == 200:
-                data = response.json()
+                data = load_json(response)
                 if 'result' in data:
                     try:
                         block_num = int(data['result'], 16)
-                        logger.info(f"✅ {self.scanner_name} latest block: {block_num:,}")
+                        self.latest_blocks[chain_id] = block_num
+                        logger.info(f"✅ {self.scanner_name} latest {EVM_CHAINS[chain_id]['name']} block: {block_num:,}")
                         sys.stdout.flush()
                         return block_num
                     except (ValueError, TypeError):
@@ -137,42 +1227,66 @@ class EtherscanAPI:
             logger.warning(f"{self.scanner_name} block lookup failed: {e}")
         
         # NO FALLBACK - if API fails, raise error
-        raise Exception(f"❌ ERROR: Cannot determine latest block from Etherscan API. Scanner cannot proceed without current block number.")
+        raise Exception(f"❌ ERROR: Cannot determine latest {EVM_CHAINS[chain_id]['name']} block from Etherscan API. Scanner cannot proceed without current block number.")
     
-    def get_token_transfers(self, contract_address, start_block, end_block):
-        """Get token transfers with enhanced rate limiting for 20 calls/sec"""
+    def get_token_transfers(self, contract_address, start_block, end_block, page=1, offset=500, sort='desc', chain_id=1):
+        """Get one page of token transfers with enhanced rate limiting - None if the fetch failed"""
         params = {
+            'chainid': chain_id,
             'module': 'account',
             'action': 'tokentx',
             'contractaddress': contract_address,
             'startblock': start_block,
             'endblock': end_block,
-            'page': 1,
-            'offset': 500,  # Optimized for 2-minute cycles
-            'sort': 'desc',
+            'page': page,
+            'offset': offset,
+            'sort': sort,
             'apikey': self.api_key
         }
         
+        # Ranges ending well below the head are final - served from the cache on reruns
+        latest_block = self.latest_blocks.get(chain_id)
+        cacheable = (
+            self.cache is not None and latest_block is not None
+            and end_block <= latest_block - evm_blocks(chain_id, ETH_CACHE_CONFIRMATIONS)
+        )
+        if cacheable:
+            cached = self.cache.get('etherscan_tokentx', self.base_url, params)
+            if cached is not None:
+                result = decode_json(cached).get('result')
+                return result if isinstance(result, list) else []
+        
         for attempt in range(3):
             try:
-                time.sleep(self.delay)  # 20 calls/sec rate limiting
-                response = self.session.get(self.base_url, params=params, timeout=45)
+                response = rate_limited_get(
+                    self.session, self.rate_limiter, self.base_url, params, timeout=45, endpoint='etherscan_tokentx'
+                )
                 
                 if response.status_code == 200:
-                    data = response.json()
+                    data = load_json(response)
                     
                     if data.get('status') == '1':
                         result = data.get('result', [])
                         if isinstance(result, list):
+                            if cacheable:
+                                self.cache.put('etherscan_tokentx', self.base_url, params, response.content)
                             return result
                         else:
                             logger.warning(f"{self.scanner_name} unexpected result type: {type(result)}")
-                            return []
+                            return None
                     elif data.get('message') == 'No transactions found':
+                        if cacheable:
+                            self.cache.put('etherscan_tokentx', self.base_url, params, response.content)
                         return []
+                    elif 'rate limit' in str(data.get('result', '')).lower():
+                        # Etherscan soft limit arrives as HTTP 200 + NOTOK
+                        logger.warning(f"{self.scanner_name} Etherscan rate limit hit - attempt {attempt + 1}")
+                        METRICS.inc('http_retries_total', endpoint='etherscan_tokentx', reason='soft_limit')
+                        self.rate_limiter.pause(1.0)
+                        continue
                     else:
                         logger.warning(f"{self.scanner_name} Etherscan API: {data.get('message', 'Unknown error')}")
-                        return []
+                        return None
                         
                 else:
                     logger.warning(f"{self.scanner_name} HTTP {response.status_code} - attempt {attempt + 1}")
@@ -180,21 +1294,173 @@ class EtherscanAPI:
             except Exception as e:
                 logger.warning(f"{self.scanner_name} transfer request failed (attempt {attempt + 1}): {e}")
             
-            # Backoff before retry
-            if attempt < 2:
-                time.sleep(self.delay * 2)
+            # Backoff before retry
+            if attempt < 2:
+                METRICS.inc('http_retries_total', endpoint='etherscan_tokentx', reason='error')
+                METRICS.inc('backoff_seconds_total', 0.5 * (attempt + 1), endpoint='etherscan_tokentx')
+                time.sleep(0.5 * (attempt + 1))
+        
+        return None  # Fetch failed - caller must not advance its checkpoint
+    
+    def iter_token_transfer_pages(self, contract_address, start_block, end_block, page_size=ETHERSCAN_PAGE_SIZE, chain_id=1):
+        """Stream every transfer in start_block..end_block page by page, oldest first
+        
+        Walks pages until a short page ends the range. When the 10,000 result
+        window fills up, the range is narrowed to start at the last block seen
+        and paging restarts there; transfers of that boundary block already
+        yielded are skipped. Raises if a page cannot be fetched.
+        """
+        max_pages = max(1, ETHERSCAN_RESULT_WINDOW // page_size)
+        boundary_keys = set()
+        
+        while start_block <= end_block:
+            last_block = None
+            last_block_keys = set()
+            
+            for page in range(1, max_pages + 1):
+                transfers = self.get_token_transfers(
+                    contract_address, start_block, end_block, page=page, offset=page_size, sort='asc', chain_id=chain_id
+                )
+                if transfers is None:
+                    raise Exception(f"transfer page {page} for blocks {start_block:,}-{end_block:,} failed")
+                
+                page_transfers = []
+                for transfer in transfers:
+                    key = (transfer.get('hash'), transfer.get('logIndex'))
+                    if key in boundary_keys:
+                        continue
+                    
+                    block_number = int(transfer.get('blockNumber', 0))
+                    if block_number != last_block:
+                        last_block = block_number
+                        last_block_keys = set()
+                    last_block_keys.add(key)
+                    page_transfers.append(transfer)
+                
+                if page_transfers:
+                    yield page_transfers
+                
+                if len(transfers) < page_size:
+                    return  # Range exhausted
+            
+            if last_block is None:
+                return
+            
+            if last_block <= start_block:
+                # A single block holds more transfers than the result window - move on
+                logger.warning(f"{self.scanner_name} block {start_block:,} exceeds Etherscan result window for {contract_address[:10]}...")
+                start_block += 1
+                boundary_keys = set()
+            else:
+                start_block = last_block
+                boundary_keys = last_block_keys
+
+class BlockCypherAPI:
+    """BlockCypher API for Bitcoin whale detection"""
+    
+    def __init__(self, api_key, calls_per_sec=BLOCKCYPHER_CALLS_PER_SEC, burst=BLOCKCYPHER_BURST, cache=None):
+        self.api_key = api_key
+        self.base_url = "https://api.blockcypher.com/v1/btc/main"
+        self.session = create_http_session(BLOCKCYPHER_CONCURRENCY * BTC_FETCH_WORKERS)  # Block pages are large - reuse and compression pay off
+        self.rate_limiter = TokenBucketRateLimiter(calls_per_sec, burst)
+        self.cache = cache
+        self.latest_height = None  # Chain height from the last get_latest_height
+        self.scanner_name = SCANNER_NAME
+    
+    def get_latest_height(self):
+        """Get current Bitcoin chain height - None if unavailable"""
+        try:
+            params = {'token': self.api_key}
+            response = rate_limited_get(
+                self.session, self.rate_limiter, self.base_url, params, timeout=30, endpoint='blockcypher_chain'
+            )
+            
+            if response.status_code == 200:
+                self.latest_height = load_json(response).get('height')
+                return self.latest_height
+            
+            logger.warning(f"{self.scanner_name} Bitcoin chain info failed: HTTP {response.status_code}")
+            
+        except Exception as e:
+            logger.error(f"{self.scanner_name} Bitcoin chain lookup failed: {e}")
+        
+        return None
+    
+    def get_block_page(self, height, txstart=0, limit=BTC_BLOCK_PAGE_SIZE):
+        """Get one page of a block's txids (plus n_tx) - None if the fetch failed"""
+        try:
+            url = f"{self.base_url}/blocks/{height}"
+            params = {'token': self.api_key, 'txstart': txstart, 'limit': limit}
+            
+            # Blocks buried under enough confirmations never change
+            cacheable = (
+                self.cache is not None and self.latest_height is not None
+                and height <= self.latest_height - BTC_CACHE_CONFIRMATIONS
+            )
+            if cacheable:
+                cached = self.cache.get('blockcypher_block', url, params)
+                if cached is not None:
+                    return decode_json(cached)
+            
+            response = rate_limited_get(self.session, self.rate_limiter, url, params, timeout=30, endpoint='blockcypher_block')
+            
+            if response.status_code == 200:
+                page = load_json(response)
+                if cacheable:
+                    self.cache.put('blockcypher_block', url, params, response.content)
+                return page
+            
+            logger.warning(f"{self.scanner_name} Bitcoin block {height} (txstart {txstart}) failed: HTTP {response.status_code}")
+            
+        except Exception as e:
+            logger.warning(f"{self.scanner_name} Bitcoin block {height} (txstart {txstart}) failed: {e}")
+        
+        return None
+    
+    def get_transactions(self, height, tx_hashes):
+        """Get full transactions of block height by hash in one batched call - None if any failed
+        
+        BlockCypher bills every hash of a batch as one request, so the batch
+        takes that many tokens from the bucket.
+        """
+        if not tx_hashes:
+            return []
+        
+        try:
+            url = f"{self.base_url}/txs/{';'.join(tx_hashes)}"
+            params = {'token': self.api_key}
+            
+            cacheable = (
+                self.cache is not None and self.latest_height is not None
+                and height <= self.latest_height - BTC_CACHE_CONFIRMATIONS
+            )
+            if cacheable:
+                cached = self.cache.get('blockcypher_txs', url, params)
+                if cached is not None:
+                    txs = decode_json(cached)
+                    return txs if isinstance(txs, list) else [txs]
+            
+            response = rate_limited_get(
+                self.session, self.rate_limiter, url, params, timeout=60, endpoint='blockcypher_txs', cost=len(tx_hashes)
+            )
+            
+            if response.status_code == 200:
+                txs = load_json(response)
+                txs = txs if isinstance(txs, list) else [txs]  # A single hash comes back unwrapped
+                failed = [tx for tx in txs if not isinstance(tx, dict) or 'error' in tx or not tx.get('hash')]
+                if failed or len(txs) != len(tx_hashes):
+                    logger.warning(f"{self.scanner_name} Bitcoin block {height}: {len(failed) or len(tx_hashes) - len(txs)} of {len(tx_hashes)} transactions failed")
+                    return None
+                if cacheable:
+                    self.cache.put('blockcypher_txs', url, params, response.content)
+                return txs
+            
+            logger.warning(f"{self.scanner_name} Bitcoin block {height} transactions failed: HTTP {response.status_code}")
+            
+        except Exception as e:
+            logger.warning(f"{self.scanner_name} Bitcoin block {height} transactions failed: {e}")
         
-        return []
-
-class BlockCypherAPI:
-    """BlockCypher API for Bitcoin whale detection"""
-    
-    def __init__(self, api_key, delay=0.34):  # 3 req/sec = 0.34s delay
-        self.api_key = api_key
-        self.delay = delay
-        self.base_url = "https://api.blockcypher.com/v1/btc/main"
-        self.session = requests.Session()
-        self.scanner_name = SCANNER_NAME
+        return None
     
     def get_address_transactions(self, address, limit=50):
         """Get Bitcoin transactions for address"""
@@ -205,11 +1471,10 @@ class BlockCypherAPI:
                 'limit': limit
             }
             
-            time.sleep(self.delay)
-            response = self.session.get(url, params=params, timeout=30)
+            response = rate_limited_get(self.session, self.rate_limiter, url, params, timeout=30, endpoint='blockcypher_address')
             
             if response.status_code == 200:
-                data = response.json()
+                data = load_json(response)
                 return data.get('txs', [])
             else:
                 logger.warning(f"{self.scanner_name} BlockCypher error: HTTP {response.status_code}")
@@ -222,14 +1487,13 @@ class BlockCypherAPI:
 class SolscanAPI:
     """Solscan API for Solana whale detection"""
     
-    def __init__(self, api_key, delay=0.06):  # 1000 req/60sec = 16.67/sec = 0.06s delay
+    def __init__(self, api_key, calls_per_sec=SOLSCAN_CALLS_PER_SEC, burst=SOLSCAN_BURST):
         self.api_key = api_key
-        self.delay = delay
         self.base_url = "https://pro-api.solscan.io/v2.0"
-        self.session = requests.Session()
+        self.rate_limiter = TokenBucketRateLimiter(calls_per_sec, burst)
         
         # Set headers with token format (Solscan v2.0 official format)
-        self.session.headers.update({
+        self.session = create_http_session(SOLSCAN_CONCURRENCY * SOLSCAN_FETCH_WORKERS, {
             'accept': 'application/json',
             'token': str(self.api_key).strip()
         })
@@ -238,6 +1502,33 @@ class SolscanAPI:
         # Debug log (remove after testing)
         logger.info(f"🔧 {self.scanner_name} Solscan API initialized with token header: {str(self.api_key)[:20]}...")
     
+    def get_account_transfers(self, address, page=1, page_size=SOLSCAN_PAGE_SIZE):
+        """Get one page of an address's transfers in the whale USD range, newest first - None if the fetch failed"""
+        try:
+            url = f"{self.base_url}/account/transfer"
+            params = {
+                'address': address,
+                'page': page,
+                'page_size': page_size,
+                'sort_by': 'block_time',
+                'sort_order': 'desc',
+                'value[]': ['500', '100000000']  # $500-$100M whale detection range
+            }
+            
+            response = rate_limited_get(self.session, self.rate_limiter, url, params, timeout=30, endpoint='solscan_transfer')
+            
+            if response.status_code == 200:
+                return load_json(response).get('data', [])
+            elif response.status_code == 401:
+                logger.warning(f"{self.scanner_name} Solscan authentication failed for {address[:8]}...")
+            else:
+                logger.debug(f"{self.scanner_name} Solscan HTTP {response.status_code} for {address[:8]}...")
+                
+        except Exception as e:
+            logger.debug(f"{self.scanner_name} Solana address {address[:8]}... failed: {e}")
+        
+        return None
+    
     def get_account_transactions(self, address, limit=50):
         """Get Solana transfer data for whale detection"""
         try:
@@ -249,13 +1540,12 @@ class SolscanAPI:
             
             logger.debug(f"🔧 {self.scanner_name} Solscan request: {url} with params: {params}")
             
-            time.sleep(self.delay)
-            response = self.session.get(url, params=params, timeout=30)
+            response = rate_limited_get(self.session, self.rate_limiter, url, params, timeout=30, endpoint='solscan_transfer')
             
             logger.debug(f"🔧 {self.scanner_name} Solscan response: {response.status_code}")
             
             if response.status_code == 200:
-                data = response.json()
+                data = load_json(response)
                 return data.get('data', [])
             elif response.status_code == 401:
                 logger.warning(f"{self.scanner_name} Solscan authentication failed - check API key")
@@ -273,13 +1563,12 @@ class SolscanAPI:
 class CoinGeckoProAPI:
     """CoinGecko Pro API with proper rate limiting for 500 calls/min"""
     
-    def __init__(self, api_key, delay=COINGECKO_DELAY):
+    def __init__(self, api_key, calls_per_sec=COINGECKO_CALLS_PER_SEC, burst=COINGECKO_BURST):
         self.api_key = api_key
-        self.delay = delay
         self.base_url = COINGECKO_PRO_BASE_URL
         self.headers = {'x-cg-pro-api-key': self.api_key}
-        self.session = requests.Session()
-        self.session.headers.update(self.headers)
+        self.session = create_http_session(1, self.headers)
+        self.rate_limiter = TokenBucketRateLimiter(calls_per_sec, burst)
         self.scanner_name = SCANNER_NAME
     
     def get_multiple_prices(self, coingecko_ids):
@@ -301,11 +1590,13 @@ class CoinGeckoProAPI:
                     'vs_currencies': 'usd'
                 }
                 
-                time.sleep(self.delay)
-                response = self.session.get(f"{self.base_url}/simple/price", params=params, timeout=30)
+                response = rate_limited_get(
+                    self.session, self.rate_limiter, f"{self.base_url}/simple/price", params, timeout=30,
+                    endpoint='coingecko_price',
+                )
                 
                 if response.status_code == 200:
-                    data = response.json()
+                    data = load_json(response)
                     
                     for coin_id, price_data in data.items():
                         price = price_data.get('usd', 0)
@@ -321,37 +1612,306 @@ class CoinGeckoProAPI:
             logger.error(f"{self.scanner_name} price lookup failed: {e}")
             return {}
 
+def drain(generator, consume):
+    """Pass every item of generator to consume, returns the generator's return value"""
+    while True:
+        try:
+            item = next(generator)
+        except StopIteration as stop:
+            return stop.value
+        consume(item)
+
+class RecentTransactionIndex:
+    """Bounded LRU set of transaction IDs known to be stored in whale_transactions
+    
+    Lets the writer drop rows from overlapping scan windows before they cost
+    an insert round trip. Anything evicted still hits ON CONFLICT DO NOTHING.
+    """
+    
+    def __init__(self, capacity=DEDUP_INDEX_SIZE):
+        self.capacity = capacity
+        self.warmed = False
+        self._ids = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def __len__(self):
+        return len(self._ids)
+    
+    def add_many(self, transaction_ids):
+        """Mark IDs as stored, most recently used last"""
+        if self.capacity <= 0:
+            return
+        
+        with self._lock:
+            for transaction_id in transaction_ids:
+                self._ids[transaction_id] = None
+                self._ids.move_to_end(transaction_id)
+            while len(self._ids) > self.capacity:
+                self._ids.popitem(last=False)
+    
+    def partition(self, records):
+        """Split records into (new, known) - known IDs are refreshed as recently used"""
+        new, known = [], []
+        
+        with self._lock:
+            for record in records:
+                if record.transaction_id in self._ids:
+                    self._ids.move_to_end(record.transaction_id)
+                    known.append(record)
+                else:
+                    new.append(record)
+        
+        return new, known
+
+class WhalePipeline:
+    """Bounded streaming pipeline between the scanners and the database
+    
+    Fetch and normalize run lazily in the scanner generators on the engine's
+    worker threads; records then pass through a bounded queue to a single
+    writer thread that validates and persists them in SAVE_BATCH_SIZE batches
+    while the next pages are being fetched. Checkpoint markers travel through
+    the same queue, so a checkpoint is only written after every record queued
+    before it has been persisted.
+    """
+    
+    def __init__(self, scanner, queue_size=PIPELINE_QUEUE_SIZE, batch_size=SAVE_BATCH_SIZE):
+        self.scanner = scanner
+        self.batch_size = batch_size
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._stats = {}       # symbol -> [saved, volume]
+        self._failed = set()   # symbols with a failed write - their checkpoints are held
+        self._writer = threading.Thread(target=self._run, name='whale-writer', daemon=True)
+        self._writer.start()
+    
+    def feed(self, symbol, records):
+        """Queue every record of a scanner generator, returns the generator's return value"""
+        return drain(records, lambda record: self._queue.put(('record', symbol, record)))
+    
+    def checkpoint(self, symbol, checkpoints):
+        """Queue scope checkpoints to be saved once the records ahead of them are written"""
+        self._queue.put(('checkpoint', symbol, checkpoints))
+    
+    def finish(self, symbol):
+        """Wait until every queued record of symbol is written, returns (saved, volume)"""
+        done = Future()
+        self._queue.put(('finish', symbol, done))
+        return done.result()
+    
+    def close(self):
+        """Write everything still queued and stop the writer thread"""
+        self._queue.put(('stop', None, None))
+        self._writer.join()
+    
+    def _run(self):
+        batch = []
+        
+        while True:
+            try:
+                kind, symbol, payload = self._queue.get(timeout=PIPELINE_FLUSH_SECONDS)
+            except queue.Empty:
+                self._flush(batch)
+                continue
+            
+            if kind == 'record':
+                batch.append((symbol, payload))
+                if len(batch) >= self.batch_size:
+                    self._flush(batch)
+                continue
+            
+            # Markers apply to everything queued before them
+            self._flush(batch)
+            
+            if kind == 'checkpoint':
+                if symbol in self._failed:
+                    logger.warning(f"{self.scanner.scanner_name} {symbol} write failed - checkpoint held")
+                else:
+                    self.scanner.save_checkpoints(payload)
+            elif kind == 'finish':
+                self._failed.discard(symbol)
+                saved, volume = self._stats.pop(symbol, (0, 0.0))
+                payload.set_result((saved, volume))
+            else:
+                return
+    
+    def _flush(self, batch):
+        if not batch:
+            return
+        
+        # Rows already stored by an overlapping window never reach the database
+        records, known = self.scanner.recent_ids.partition([record for _, record in batch])
+        METRICS.inc('rows_total', len(batch), stage='queued')
+        METRICS.inc('rows_total', len(known), stage='known')
+        if known:
+            logger.debug(f"{self.scanner.scanner_name} skipped {len(known)} known duplicates")
+        
+        try:
+            saved_ids = self.scanner.persist_transactions(records)
+        except Exception as e:
+            logger.error(f"❌ {self.scanner.scanner_name} writer failed on {len(batch)} records: {type(e).__name__}: {str(e)[:200]}")
+            self._failed.update(symbol for symbol, _ in batch)
+            saved_ids = set()
+        
+        for symbol, record in batch:
+            stats = self._stats.setdefault(symbol, [0, 0.0])
+            if record.transaction_id in saved_ids:
+                stats[0] += 1
+            stats[1] += float(record.amount_usd)
+        
+        batch.clear()
+
+class ScanScheduler:
+    """Per-cycle token order, dormancy and request budget
+    
+    Contract tokens are ranked by load order (priority DESC), whale yield
+    over the last SCHEDULER_YIELD_DAYS and the time since their checkpoint,
+    so a token comes up sooner the more valuable it is and the longer it has
+    waited. Tokens without recent whales are dormant and only scanned every
+    DORMANT_SCAN_EVERY cycles, or sooner if waiting would push them past the
+    catch-up window. Checkpoints make deferral lossless - the next scan
+    resumes where the last one stopped.
+    
+    Each provider may spend what its rate limit delivers in one interval
+    (capped by SCAN_REQUEST_BUDGET) per cycle. That share is halved after a
+    cycle that drew 429s and recovers gradually after clean ones.
+    """
+    
+    def __init__(self, interval=SCAN_INTERVAL_SECONDS, request_budget=SCAN_REQUEST_BUDGET):
+        self.interval = interval
+        self.request_budget = request_budget
+        self.headroom = 1.0
+        self.yields = None  # symbol -> whales in the yield window, None when unknown
+        self._marks = {}    # rate limiter -> (requests, throttled) at cycle start
+        self._spent = set()
+    
+    def plan(self, tokens, checkpoints, heads):
+        """Split tokens into (due, deferred) lists of (symbol, token_info), most urgent first"""
+        block_seconds = EVM_CHAINS[1]['block_seconds']  # Windows are defined in mainnet blocks
+        max_catchup_seconds = ETH_MAX_CATCHUP_BLOCKS * block_seconds
+        ranked, deferred = [], []
+        
+        for rank, (symbol, token_info) in enumerate(tokens.items()):
+            chain_id = token_info.get('chain_id', 1)
+            if not token_info.get('address') or chain_id not in heads:
+                # Native coins have providers of their own; headless chains are skipped by the scan
+                ranked.append((True, math.inf, -rank, symbol, token_info))
+                continue
+            
+            checkpoint = checkpoints.get(evm_scope(token_info['address'], chain_id))
+            if checkpoint is None:
+                waited = ETH_DEFAULT_LOOKBACK_BLOCKS * block_seconds
+            else:
+                waited = max(0, heads[chain_id] - checkpoint) * EVM_CHAINS[chain_id]['block_seconds']
+            
+            # Two more cycles of waiting could drop blocks off the catch-up window
+            at_risk = waited + 2 * self.interval >= max_catchup_seconds
+            whales = None if self.yields is None else self.yields.get(symbol, 0)
+            
+            if whales == 0 and checkpoint is not None and not at_risk and waited < (DORMANT_SCAN_EVERY - 0.5) * self.interval:
+                deferred.append((symbol, token_info))
+                continue
+            
+            # Load order is priority DESC - the first token weighs twice the last
+            priority = 2 - rank / len(tokens)
+            urgency = priority * (1 + math.log1p((whales or 0) / SCHEDULER_YIELD_DAYS)) * waited
+            ranked.append((at_risk, urgency, -rank, symbol, token_info))
+        
+        ranked.sort(key=lambda item: item[:3], reverse=True)
+        return [(symbol, token_info) for *_, symbol, token_info in ranked], deferred
+    
+    def start_cycle(self, rate_limiters):
+        """Mark the request counters this cycle's budget is measured from"""
+        self._marks = {limiter: (limiter.requests, limiter.throttled) for limiter in rate_limiters}
+        self._spent = set()
+    
+    def budget(self, rate_limiter):
+        """Requests rate_limiter may hand out this cycle"""
+        budget = rate_limiter.rate * self.interval
+        if self.request_budget > 0:
+            budget = min(budget, self.request_budget)
+        return budget * self.headroom
+    
+    def exhausted(self, rate_limiter):
+        """True once rate_limiter has used up its budget for this cycle"""
+        mark = self._marks.get(rate_limiter)
+        if mark is None or rate_limiter.requests - mark[0] < self.budget(rate_limiter):
+            return False
+        
+        if rate_limiter not in self._spent:
+            self._spent.add(rate_limiter)
+            logger.warning(f"⏳ {SCANNER_NAME} request budget of {self.budget(rate_limiter):,.0f} spent - remaining tokens wait for the next cycle")
+        return True
+    
+    def end_cycle(self):
+        """Adapt the budget share to the 429s of the finished cycle, returns True if throttled"""
+        throttled = any(limiter.throttled > mark[1] for limiter, mark in self._marks.items())
+        if throttled:
+            self.headroom = max(SCHEDULER_MIN_HEADROOM, self.headroom / 2)
+        else:
+            self.headroom = min(1.0, self.headroom * 1.25)
+        self._marks = {}
+        return throttled
+
 class MasterWhaleScanner:
     """Master Whale Scanner - Single scanner for ALL tokens"""
     
-    def __init__(self):
-        self.etherscan = EtherscanAPI(ETHERSCAN_API_KEY)
-        self.coingecko = CoinGeckoProAPI(COINGECKO_API_KEY)
-        self.blockcypher = BlockCypherAPI(BLOCKCYPHER_API_KEY)
-        self.solscan = SolscanAPI(SOLSCAN_API_KEY)
-        self.db_connection = None
+    def __init__(self, config=None):
+        self.config = config = config or ScannerConfig.from_env()
         self.scanner_name = SCANNER_NAME
+        if config.shard_count > 1:
+            self.scanner_name = f"{SCANNER_NAME}[{config.shard_index}/{config.shard_count}]"
+            METRICS.labels['shard'] = str(config.shard_index)
+        
+        cache_path = shard_path(RESPONSE_CACHE_PATH, config.shard_index, config.shard_count)
+        self.response_cache = ResponseCache(cache_path) if cache_path else None
+        self.etherscan = EtherscanAPI(
+            config.etherscan_api_key, *config.rate_limit('etherscan_api_key', ETHERSCAN_CALLS_PER_SEC, ETHERSCAN_BURST),
+            cache=self.response_cache,
+        )
+        self.coingecko = CoinGeckoProAPI(
+            config.coingecko_api_key, *config.rate_limit('coingecko_api_key', COINGECKO_CALLS_PER_SEC, COINGECKO_BURST),
+        )
+        self.blockcypher = BlockCypherAPI(
+            config.blockcypher_api_key, *config.rate_limit('blockcypher_api_key', BLOCKCYPHER_CALLS_PER_SEC, BLOCKCYPHER_BURST),
+            cache=self.response_cache,
+        )
+        self.solscan = SolscanAPI(
+            config.solscan_api_key, *config.rate_limit('solscan_api_key', SOLSCAN_CALLS_PER_SEC, SOLSCAN_BURST),
+        )
+        self.evm_rpc = {
+            chain_id: EvmRpcAPI(url, chain_id, *config.rate_limit('evm_rpc', RPC_CALLS_PER_SEC, RPC_BURST))
+            for chain_id, url in EVM_RPC_URLS.items()
+        }
+        self.db_pool = DatabasePool(self.config.database_url, max_size=max(2, DB_POOL_MAX_SIZE))  # Scan lock pins one connection
+        self.checkpoints = {}
+        self.processed_btc_heights = set()
+        self.btc_block_hashes = {}  # height -> hash of the blocks scanned near the checkpoint
+        self.recent_ids = RecentTransactionIndex()
+        self.scheduler = ScanScheduler()
+        self.latest_prices_enabled = False
+        self.stop_event = threading.Event()
         self.tokens_to_scan = self.load_tokens_for_scanning()
+        self.tokens_loaded_at = time.monotonic()
 
     def load_tokens_for_scanning(self):
         """Load tokens directly from Trinity database - bypassing broken contracts endpoint"""
         try:
             logger.info(f"🔍 {self.scanner_name} querying Trinity database directly for tokens and contracts...")
             
-            # Connect directly to Trinity database to get tokens with contract addresses
-            conn = psycopg.connect(DB_URL)
-            cursor = conn.cursor()
-            
-            # Get active tokens from supported_symbols table (populated by data collector)
-            cursor.execute("""
-                SELECT symbol, coin_id, ethereum_contract_address, contract_decimals
-                FROM supported_symbols 
-                WHERE is_active = true 
-                ORDER BY priority DESC
-            """)
+            # Query Trinity database to get tokens with contract addresses
+            try:
+                with self.db_pool.connection() as conn, conn.cursor() as cursor:
+                    # Get active tokens from supported_symbols table (populated by data collector)
+                    cursor.execute(TOKENS_SELECT_SQL)
+                    rows = cursor.fetchall()
+                    
+            except psycopg.errors.UndefinedColumn:
+                # Migration 004 not applied yet - every contract is on Ethereum mainnet
+                logger.warning(f"{self.scanner_name} supported_symbols.chain_id missing - apply db/migrations/004_supported_symbols_chain_id.sql")
+                with self.db_pool.connection() as conn, conn.cursor() as cursor:
+                    cursor.execute(TOKENS_FALLBACK_SQL)
+                    rows = cursor.fetchall()
             
             contracts = {}
-            rows = cursor.fetchall()
             
             for row in rows:
                 symbol = row[0]
@@ -362,11 +1922,10 @@ class MasterWhaleScanner:
                 contracts[symbol] = {
                     'coingecko_id': coin_id,
                     'decimals': contract_decimals,
-                    'address': contract_address  # None for native tokens like BTC/SOL
+                    'address': contract_address,  # None for native tokens like BTC/SOL
+                    'chain_id': row[4] or 1  # EVM chain of the contract
                 }
             
-            cursor.close()
-            conn.close()
             
             if len(contracts) >= 0:
                 # Add native blockchain tokens manually (they have no contracts)
@@ -381,6 +1940,14 @@ class MasterWhaleScanner:
                     'address': None  # Native Solana has no contract  
                 }
                 
+                if self.config.shard_count > 1:
+                    total = len(contracts)
+                    contracts = {
+                        symbol: token_info for symbol, token_info in contracts.items()
+                        if self.owns(token_shard_key(symbol, token_info))
+                    }
+                    logger.info(f"🧩 {self.scanner_name} owns {len(contracts)} of {total} tokens")
+                
                 logger.info(f"✅ {self.scanner_name} loaded {len(contracts)} tokens directly from Trinity database")
                 logger.info(f"🚀 {self.scanner_name} bypassed broken contracts API endpoint!")
                 logger.info(f"💰 {self.scanner_name} using real contract addresses from data collector")
@@ -393,12 +1960,18 @@ class MasterWhaleScanner:
             logger.error(f"❌ Database query failed: {e}")
             raise Exception(f"❌ CRITICAL ERROR: Cannot load tokens from Trinity database - {e}. Master Scanner requires database connection.")
     
+    def owns(self, key):
+        """True if this shard scans the token or checkpoint scope behind key"""
+        return shard_of(key, self.config.shard_count) == self.config.shard_index
+    
     def detect_blockchain(self, symbol, token_info):
         """Detect blockchain from token contract data - NO fallbacks"""
         try:
             # Check if token has Ethereum contract address (from database)
             if 'address' in token_info and token_info['address']:
                 # Has contract address = EVM-based blockchain
+                if token_info.get('chain_id', 1) not in EVM_CHAINS:
+                    raise Exception(f"{symbol} is on unsupported chain {token_info.get('chain_id')}")
                 return 'eth'  # Etherscan V2 covers all EVM chains
             
             # Bitcoin (no contract addresses in database)
@@ -418,45 +1991,70 @@ class MasterWhaleScanner:
             return None
     
     def get_prices_from_database(self):
-        """Get current token prices from CoinGecko database"""
+        """Get current token prices from the maintained latest-price table"""
         try:
-            # Query market data from your database
-            conn = psycopg.connect(DB_URL)
-            cursor = conn.cursor()
-            
-            cursor.execute("""
-                SELECT DISTINCT ON (coin_symbol) coin_symbol, 
-                       FIRST_VALUE(price_per_token) OVER (
-                           PARTITION BY coin_symbol 
-                           ORDER BY block_timestamp DESC
-                       ) as current_price
-                FROM whale_transactions 
-                WHERE price_per_token > 0
-                ORDER BY coin_symbol, block_timestamp DESC
-            """)
+            try:
+                with self.db_pool.connection() as conn, conn.cursor() as cursor:
+                    cursor.execute(LATEST_PRICES_SELECT_SQL)
+                    rows = cursor.fetchall()
+                self.latest_prices_enabled = True
+                
+            except psycopg.errors.UndefinedTable:
+                # Migration 002 not applied yet - fall back to scanning whale_transactions
+                logger.warning(f"{self.scanner_name} token_latest_prices missing - apply db/migrations/002_token_latest_prices.sql")
+                self.latest_prices_enabled = False
+                with self.db_pool.connection() as conn, conn.cursor() as cursor:
+                    cursor.execute(LATEST_PRICES_FALLBACK_SQL)
+                    rows = cursor.fetchall()
             
             prices = {}
-            for row in cursor.fetchall():
+            for row in rows:
                 symbol = row[0].upper()
                 price = float(row[1])
                 if symbol in self.tokens_to_scan and 'coingecko_id' in self.tokens_to_scan[symbol]:
                     prices[self.tokens_to_scan[symbol]['coingecko_id']] = price
             
-            cursor.close()
-            conn.close()
-            
             logger.info(f"💰 {self.scanner_name} retrieved {len(prices)} prices from database")
             return prices
             
         except Exception as e:
             logger.error(f"❌ Database price lookup failed: {e}")
             return {}
+    
+    def update_latest_prices(self, conn, transactions):
+        """Refresh token_latest_prices from the newest priced row per symbol"""
+        latest = {}
+        for tx in transactions:
+            if not tx.price_per_token or tx.price_per_token <= 0:
+                continue
+            current = latest.get(tx.coin_symbol)
+            if current is None or tx.block_timestamp > current.block_timestamp:
+                latest[tx.coin_symbol] = tx
+        
+        if not latest:
+            return
+        
+        try:
+            with conn.cursor() as cur:
+                cur.executemany(LATEST_PRICE_UPSERT_SQL, [
+                    {
+                        'coin_symbol': symbol,
+                        'price_per_token': tx.price_per_token,
+                        'block_timestamp': tx.block_timestamp
+                    }
+                    for symbol, tx in sorted(latest.items())
+                ])
+            conn.commit()
+            
+        except Exception as e:
+            logger.warning(f"{self.scanner_name} latest price refresh failed: {type(e).__name__}: {str(e)[:100]}")
+            conn.rollback()
 
     def connect_database(self):
-        """Connect to database with autocommit disabled"""
+        """Check out a pooled connection to confirm the database is reachable"""
         try:
-            self.db_connection = psycopg.connect(DB_URL)
-            self.db_connection.autocommit = False  # Enable transaction control
+            with self.db_pool.connection() as conn:
+                conn.execute("SELECT 1")
             logger.info(f"✅ {self.scanner_name} database connected")
             sys.stdout.flush()
             return True
@@ -472,476 +2070,1090 @@ class MasterWhaleScanner:
         try:
             # Check required fields
             for field in required_fields:
-                if field not in tx or tx[field] is None or tx[field] == '':
+                value = getattr(tx, field)
+                if value is None or value == '':
                     return False
             
             # Validate transaction ID format for multi-blockchain
-            if not isinstance(tx['transaction_id'], str) or len(tx['transaction_id']) < 10:
+            if not isinstance(tx.transaction_id, str) or len(tx.transaction_id) < 10:
                 return False
             
             # Different blockchains have different transaction ID formats
-            blockchain = tx.get('blockchain', 'eth')
-            if blockchain == 'eth':
-                # Ethereum: 0x + 64 hex characters
-                if not tx['transaction_id'].startswith('0x') or len(tx['transaction_id']) != 66:
+            blockchain = tx.blockchain
+            if blockchain in EVM_BLOCKCHAINS:
+                # Ethereum and other EVM chains: 0x + 64 hex characters
+                if not tx.transaction_id.startswith('0x') or len(tx.transaction_id) != 66:
                     return False
             elif blockchain == 'btc':
                 # Bitcoin: 64 hex characters (no 0x prefix)
-                if len(tx['transaction_id']) != 64:
+                if len(tx.transaction_id) != 64:
                     return False
             elif blockchain == 'sol':
                 # Solana: base58 encoded, variable length
-                if len(tx['transaction_id']) < 80 or len(tx['transaction_id']) > 90:
+                if len(tx.transaction_id) < 80 or len(tx.transaction_id) > 90:
                     return False
             
             # Validate wallet address format for multi-blockchain
-            if not isinstance(tx['wallet_address'], str) or len(tx['wallet_address']) < 10:
+            if not isinstance(tx.wallet_address, str) or len(tx.wallet_address) < 10:
                 return False
             
             # Different blockchains have different address formats
-            blockchain = tx.get('blockchain', 'eth')
-            if blockchain == 'eth':
-                # Ethereum: 0x + 40 hex characters = 42 total
-                if not tx['wallet_address'].startswith('0x') or len(tx['wallet_address']) != 42:
+            blockchain = tx.blockchain
+            if blockchain in EVM_BLOCKCHAINS:
+                # Ethereum and other EVM chains: 0x + 40 hex characters = 42 total
+                if not tx.wallet_address.startswith('0x') or len(tx.wallet_address) != 42:
                     return False
             elif blockchain == 'btc':
                 # Bitcoin: 26-35 characters, various formats
-                if len(tx['wallet_address']) < 26 or len(tx['wallet_address']) > 35:
+                if len(tx.wallet_address) < 26 or len(tx.wallet_address) > 35:
                     return False
             elif blockchain == 'sol':
                 # Solana: base58 encoded, typically 32-44 characters
-                if len(tx['wallet_address']) < 32 or len(tx['wallet_address']) > 44:
+                if len(tx.wallet_address) < 32 or len(tx.wallet_address) > 44:
                     return False
             
-            # Validate USD amount range ($500 minimum for master scanner)
-            usd_amount = float(tx['amount_usd'])
-            if usd_amount < WHALE_THRESHOLD_USD or usd_amount > MAX_USD_AMOUNT:
-                return False
+            # Validate USD amount range ($500 minimum for master scanner)
+            usd_amount = float(tx.amount_usd)
+            if usd_amount < WHALE_THRESHOLD_USD or usd_amount > MAX_USD_AMOUNT:
+                return False
+            
+            return True
+            
+        except (ValueError, TypeError, AttributeError):
+            return False
+    
+    def save_transactions(self, transactions):
+        """Save transactions in pipelined batches, returns the number of new rows"""
+        return len(self.persist_transactions(transactions))
+    
+    def persist_transactions(self, transactions):
+        """Validate and save transactions in pipelined batches, isolating bad rows on failure
+        
+        Returns the set of transaction IDs that were newly inserted.
+        """
+        if not transactions:
+            return set()
+        
+        valid_transactions = []
+        invalid_count = 0
+        
+        with METRICS.timer('stage_seconds', stage='validate'):
+            for tx in transactions:
+                # Validate each transaction before attempting to save
+                if not self.validate_transaction_data(tx):
+                    logger.debug(f"{self.scanner_name} skipping invalid transaction: {tx.transaction_id}")
+                    invalid_count += 1
+                    continue
+                valid_transactions.append(tx)
+        
+        saved_ids = set()
+        stored_ids = []
+        duplicate_count = 0
+        failed_count = 0
+        
+        # Consistent row order keeps concurrent writers from deadlocking on the same IDs
+        valid_transactions.sort(key=lambda tx: tx.transaction_id)
+        
+        with self.db_pool.connection() as conn:
+            for i in range(0, len(valid_transactions), SAVE_BATCH_SIZE):
+                batch = valid_transactions[i:i + SAVE_BATCH_SIZE]
+                
+                try:
+                    with METRICS.timer('db_write_seconds', operation='insert_batch'):
+                        inserted = self.insert_transaction_batch(conn, batch)
+                    saved_ids.update(inserted)
+                    duplicate_count += len(batch) - len(inserted)
+                    stored_ids.extend(tx.transaction_id for tx in batch)
+                    
+                except Exception as e:
+                    # One bad row aborts the whole batch - fall back to row-by-row for this batch only
+                    conn.rollback()
+                    logger.warning(f"{self.scanner_name} batch insert failed ({type(e).__name__}: {str(e)[:100]}) - retrying {len(batch)} rows individually")
+                    
+                    for tx in batch:
+                        with METRICS.timer('db_write_seconds', operation='insert_row'):
+                            outcome = self.save_single_transaction(conn, tx)
+                        if outcome == 'saved':
+                            saved_ids.add(tx.transaction_id)
+                            stored_ids.append(tx.transaction_id)
+                        elif outcome == 'duplicate':
+                            duplicate_count += 1
+                            stored_ids.append(tx.transaction_id)
+                        else:
+                            failed_count += 1
+            
+            # Inserted or already present - either way the row is in the table now
+            self.recent_ids.add_many(stored_ids)
+            
+            if self.latest_prices_enabled:
+                with METRICS.timer('db_write_seconds', operation='latest_prices'):
+                    self.update_latest_prices(conn, valid_transactions)
+        
+        METRICS.inc('rows_total', invalid_count, stage='invalid')
+        METRICS.inc('rows_total', len(saved_ids), stage='inserted')
+        METRICS.inc('rows_total', duplicate_count, stage='duplicate')
+        METRICS.inc('rows_total', failed_count, stage='failed')
+        
+        logger.info(
+            f"💾 {self.scanner_name} saved {len(saved_ids)}/{len(transactions)} whale transactions "
+            f"({duplicate_count} duplicates, {invalid_count} invalid, {failed_count} failed)"
+        )
+        return saved_ids
+    
+    def insert_transaction_batch(self, conn, batch):
+        """Insert a batch of validated transactions in one pipeline, returns the new transaction IDs"""
+        wallet_addresses = sorted({tx.wallet_address for tx in batch})  # Stable lock order
+        inserted = []
+        
+        with conn.cursor() as wallet_cur, conn.cursor() as cur:
+            with conn.pipeline():
+                # First ensure wallets exist
+                wallet_cur.execute(WALLET_BATCH_INSERT_SQL, {'wallet_addresses': wallet_addresses})
+                
+                # Then insert whale transactions - one result set per row
+                cur.executemany(WHALE_TRANSACTION_INSERT_SQL, [tx.as_row() for tx in batch], returning=True)
+                while True:
+                    row = cur.fetchone()
+                    if row is not None:
+                        inserted.append(row[0])
+                    if not cur.nextset():
+                        break
+        
+        conn.commit()
+        return inserted
+    
+    def save_single_transaction(self, conn, tx):
+        """Save one transaction in its own transaction, returns 'saved', 'duplicate' or 'failed'"""
+        try:
+            with conn.cursor() as cur:
+                # First ensure wallet exists
+                cur.execute(WALLET_INSERT_SQL, {'wallet_address': tx.wallet_address})
+                
+                # Then insert whale transaction
+                cur.execute(WHALE_TRANSACTION_INSERT_SQL, tx.as_row())
+                inserted = cur.rowcount > 0
+            
+            # Commit each transaction individually to avoid cascade failures
+            conn.commit()
+            
+            if inserted:
+                return 'saved'
+            logger.debug(f"{self.scanner_name} skipped duplicate: {tx.transaction_id[:16]}...")
+            return 'duplicate'
+            
+        except IntegrityError as e:
+            # Duplicate transaction IDs are absorbed by ON CONFLICT - anything else is a bad row
+            logger.warning(f"{self.scanner_name} integrity error: {str(e)[:100]}")
+            conn.rollback()
+            return 'failed'
+            
+        except DataError as e:
+            logger.warning(f"{self.scanner_name} data error: {str(e)[:100]}")
+            conn.rollback()
+            return 'failed'
+            
+        except Exception as e:
+            logger.warning(f"{self.scanner_name} database error: {type(e).__name__}: {str(e)[:200]}")
+            conn.rollback()
+            return 'failed'
+    
+    def scan_bitcoin_whales(self, symbol, token_price, start_height, end_height):
+        """Scan every transaction of Bitcoin blocks start_height..end_height
+        
+        First txid pages of all blocks are fetched in parallel, then the
+        remaining txstart pages of every block, then the transactions in
+        batched /txs calls one block ahead of the consumer. Generator - yields
+        whale records block by block and returns completed_through, the last
+        height of the fully processed prefix; heights processed beyond a
+        failed block are remembered so later runs skip them. On shutdown the
+        queued fetches are dropped and the block in flight is left for the
+        next run.
+        """
+        logger.info(f"🔍 {self.scanner_name} scanning Bitcoin whales for {symbol} (${token_price:,.2f})...")
+        logger.info(f"  📊 Scanning Bitcoin blocks {start_height:,} to {end_height:,}")
+        
+        # Heights at or below the checkpoint never come back, unless check_bitcoin_tail finds a reorg
+        self.processed_btc_heights = {h for h in self.processed_btc_heights if h >= start_height}
+        self.btc_block_hashes = {h: block_hash for h, block_hash in self.btc_block_hashes.items() if h > start_height - BTC_CACHE_CONFIRMATIONS}
+        heights = [h for h in range(start_height, end_height + 1) if h not in self.processed_btc_heights]
+        
+        whale_count = 0
+        failed_heights = set()
+        processed = set()
+        # Heights skipped past a failed block are not re-checked for reorgs - only remember final ones
+        final_height = (self.blockcypher.latest_height or end_height) - BTC_CACHE_CONFIRMATIONS
+        
+        # Track unique transactions to prevent duplicates
+        seen_transactions = set()
+        window = raw_whale_window(8, token_price)
+        
+        try:
+            with ThreadPoolExecutor(max_workers=BTC_FETCH_WORKERS, thread_name_prefix='btc-fetch') as pool:
+                first_pages = dict(zip(heights, pool.map(self.blockcypher.get_block_page, heights)))
+                
+                # Every block holds n_tx transactions - queue the remaining txstart pages
+                page_jobs = {}
+                for block_height, page in first_pages.items():
+                    if page is None:
+                        continue
+                    for txstart in range(BTC_BLOCK_PAGE_SIZE, page.get('n_tx', 0), BTC_BLOCK_PAGE_SIZE):
+                        page_jobs.setdefault(block_height, []).append(
+                            pool.submit(self.blockcypher.get_block_page, block_height, txstart)
+                        )
+                
+                def submit_transactions(block_height):
+                    """Queue the batched /txs fetches of one block - None if one of its txid pages failed"""
+                    pages = [first_pages[block_height]] + [job.result() for job in page_jobs.get(block_height, [])]
+                    if any(page is None for page in pages):
+                        return None
+                    txids = [txid for page in pages for txid in page.get('txids', [])]
+                    return [
+                        pool.submit(self.blockcypher.get_transactions, block_height, txids[start:start + BTC_TX_BATCH_SIZE])
+                        for start in range(0, len(txids), BTC_TX_BATCH_SIZE)
+                    ]
+                
+                # One block of lookahead keeps the workers busy without holding every block in memory
+                pending = submit_transactions(heights[0]) if heights else None
+                for index, block_height in enumerate(heights):
+                    jobs = pending
+                    pending = submit_transactions(heights[index + 1]) if index + 1 < len(heights) else None
+                    
+                    batches = []
+                    for job in jobs or []:
+                        if self.stop_event.is_set():
+                            break
+                        batches.append(job.result())
+                    
+                    if self.stop_event.is_set():
+                        # Shutting down - this block and the rest are rescanned next run
+                        pool.shutdown(wait=False, cancel_futures=True)
+                        failed_heights.update(heights[index:])
+                        logger.info(f"{self.scanner_name} stopping Bitcoin scan at block {block_height:,}")
+                        break
+                    
+                    if jobs is None or any(batch is None for batch in batches):
+                        failed_heights.add(block_height)
+                        continue
+                    
+                    # Process transactions in this block
+                    for batch in batches:
+                        METRICS.inc('transfers_fetched_total', len(batch), blockchain='btc')
+                        for tx in batch:
+                            whale_tx = self.build_bitcoin_whale(symbol, token_price, window, block_height, tx, seen_transactions)
+                            if whale_tx:
+                                whale_count += 1
+                                yield whale_tx
+                    
+                    processed.add(block_height)
+                    self.btc_block_hashes[block_height] = first_pages[block_height].get('hash')
+                    if block_height <= final_height:
+                        self.processed_btc_heights.add(block_height)
+            
+        except Exception as e:
+            logger.error(f"❌ {self.scanner_name} Bitcoin whale scan failed: {e}")
+            failed_heights.update(h for h in heights if h not in processed)
+        
+        completed_through = min(failed_heights) - 1 if failed_heights else end_height
+        
+        if whale_count:
+            logger.info(f"  🐋 {self.scanner_name} found {whale_count} Bitcoin whales")
+        else:
+            logger.info(f"  ⚪ {self.scanner_name} no Bitcoin whales found in recent blocks")
+        
+        return completed_through
+    
+    def build_bitcoin_whale(self, symbol, token_price, window, block_height, tx, seen_transactions):
+        """Turn one Bitcoin transaction into a whale record - None if filtered out"""
+        try:
+            tx_hash = tx.get('hash')
+            if not tx_hash or tx_hash in seen_transactions:
+                return None
+                
+            seen_transactions.add(tx_hash)
+            
+            # Check whale threshold ($500 minimum) on the raw satoshi total
+            total_value_satoshi = int(tx.get('total', 0))
+            if not in_whale_window(total_value_satoshi, window):
+                return None
+            
+            # Convert satoshi to BTC (1 BTC = 100M satoshi)
+            btc_amount, usd_amount = token_amounts(total_value_satoshi, 8, token_price)
+            
+            # Get primary addresses (largest input/output)
+            inputs = tx.get('inputs', [])
+            outputs = tx.get('outputs', [])
+            
+            from_addr = None
+            to_addr = None
+            
+            if inputs and len(inputs) > 0:
+                # Get address from largest input
+                largest_input = max(inputs, key=lambda x: x.get('output_value', 0))
+                from_addr = largest_input.get('addresses', [None])[0] if largest_input.get('addresses') else None
+            
+            if outputs and len(outputs) > 0:
+                # Get address from largest output  
+                largest_output = max(outputs, key=lambda x: x.get('value', 0))
+                to_addr = largest_output.get('addresses', [None])[0] if largest_output.get('addresses') else None
+            
+            if not to_addr:  # Need at least destination address
+                return None
+            
+            # Create Bitcoin whale transaction record
+            whale_tx = WhaleTransaction(
+                transaction_id=tx_hash,
+                wallet_address=to_addr,  # Receiver is the whale
+                blockchain='btc',
+                block_number=block_height,
+                block_timestamp=datetime.fromisoformat(tx.get('confirmed').replace('Z', '+00:00')) if tx.get('confirmed') else datetime.utcnow(),
+                transaction_index=None,  # Bitcoin doesn't use transaction index like Ethereum
+                from_address=from_addr,
+                to_address=to_addr,
+                gas_used=None,  # Bitcoin doesn't use gas
+                gas_price=None,  # Bitcoin doesn't use gas
+                coin_symbol=symbol,
+                coin_contract=None,  # Bitcoin is native, no contract
+                coin_decimals=8,  # Bitcoin has 8 decimal places
+                activity_type='transfer',
+                amount_tokens=btc_amount,
+                amount_usd=usd_amount,
+                price_per_token=token_price,
+                raw_transaction=raw_payload('btc', tx),
+                data_source=SCANNER_VERSION,
+                processed_at=datetime.utcnow()
+            )
+            
+            return whale_tx
+            
+        except Exception as e:
+            logger.debug(f"{self.scanner_name} error processing Bitcoin tx: {e}")
+            return None
+    
+    def scan_solana_whales(self, symbol, token_price):
+        """Poll every watched Solana address concurrently for transfers since its cursor
+        
+        Generator - yields whale records and returns cursors, mapping each
+        successfully polled address to the newest slot seen, to be stored once
+        the whales are saved.
+        """
+        logger.info(f"🔍 {self.scanner_name} scanning Solana whales for {symbol} (${token_price:,.2f})...")
+        
+        if not SOLANA_WHALE_ADDRESSES:
+            logger.warning(f"{self.scanner_name} no SOLANA_WHALE_ADDRESSES configured")
+            return {}
+        
+        logger.info(f"  📊 Scanning {len(SOLANA_WHALE_ADDRESSES)} Solana whale addresses")
+        
+        whale_count = 0
+        cursors = {}
+        seen_transactions = set()
+        window = raw_whale_window(9, token_price)
+        
+        try:
+            with ThreadPoolExecutor(max_workers=SOLSCAN_FETCH_WORKERS, thread_name_prefix='sol-fetch') as pool:
+                results = pool.map(self.fetch_solana_address, SOLANA_WHALE_ADDRESSES)
+                
+                for address, (transfers, newest_slot) in zip(SOLANA_WHALE_ADDRESSES, results):
+                    if transfers is None:
+                        continue  # Cursor stays put - retried next cycle
+                    
+                    for tx in transfers:
+                        whale_tx = self.build_solana_whale(symbol, token_price, window, tx, seen_transactions)
+                        if whale_tx:
+                            whale_count += 1
+                            yield whale_tx
+                    
+                    scope = f"sol:{address}"
+                    if newest_slot and newest_slot != self.checkpoints.get(scope):
+                        cursors[scope] = newest_slot
+                        
+        except Exception as e:
+            logger.error(f"❌ {self.scanner_name} Solana whale scan failed: {e}")
+            return {}
+        
+        if whale_count:
+            logger.info(f"  🐋 {self.scanner_name} found {whale_count} Solana whales")
+        else:
+            logger.info(f"  ⚪ {self.scanner_name} no Solana whales found in recent transactions")
+        
+        return cursors
+    
+    def fetch_solana_address(self, address):
+        """Page through an address's transfers newer than its cursor, returns (transfers, newest_slot)
+        
+        If SOLSCAN_MAX_PAGES full pages never reach the cursor, the transfers
+        read are still returned but the cursor stays put: advancing it would
+        skip the unread gap for good.
+        """
+        last_slot = self.checkpoints.get(f"sol:{address}")
+        max_pages = SOLSCAN_MAX_PAGES if last_slot else 1  # First sight - newest page only
+        transfers = []
+        newest_slot = last_slot
+        reached_cursor = not last_slot
+        
+        for page in range(1, max_pages + 1):
+            page_transfers = self.solscan.get_account_transfers(address, page=page)
+            if page_transfers is None:
+                return None, None
+            METRICS.inc('transfers_fetched_total', len(page_transfers), blockchain='sol')
+            
+            for tx in page_transfers:
+                slot = tx.get('slot') or 0
+                if last_slot and slot <= last_slot:
+                    reached_cursor = True
+                    break  # Reached transfers stored by a previous run
+                transfers.append(tx)
+                newest_slot = max(newest_slot or 0, slot)
+            else:
+                if len(page_transfers) == SOLSCAN_PAGE_SIZE:
+                    continue  # Full page with nothing old yet - keep paging
+                reached_cursor = True  # Short page - the address has nothing older
+            break
+        
+        if not reached_cursor:
+            oldest_slot = min((tx.get('slot') or 0 for tx in transfers), default=0)
+            logger.warning(
+                f"{self.scanner_name} Solana {address[:8]}... has more than {max_pages} pages since slot {last_slot:,} "
+                f"(read back to {oldest_slot:,}) - cursor held, raise SOLSCAN_MAX_PAGES to close the gap"
+            )
+            newest_slot = last_slot
+        
+        logger.debug(f"    📊 Address {address[:8]}... returned {len(transfers)} new transfers")
+        return transfers, newest_slot
+    
+    def build_solana_whale(self, symbol, token_price, window, tx, seen_transactions):
+        """Turn one Solscan transfer into a whale record - None if filtered out"""
+        try:
+            tx_signature = tx.get('trans_id') or tx.get('signature')
+            if not tx_signature or tx_signature in seen_transactions:
+                return None
+                
+            seen_transactions.add(tx_signature)
+            
+            # Get transaction amount (SOL is native, 9 decimals) and check the $500 threshold
+            amount_raw = int(tx.get('amount') or 0)
+            if not in_whale_window(amount_raw, window):
+                return None
+            
+            # Convert to SOL (1 SOL = 1B lamports)
+            sol_amount, usd_amount = token_amounts(amount_raw, 9, token_price)
+            
+            # Get transaction addresses
+            from_addr = tx.get('source') or tx.get('from_address')
+            to_addr = tx.get('destination') or tx.get('to_address')
+            
+            if not to_addr:  # Need at least destination address
+                return None
+            
+            # Get transaction timestamp
+            tx_time = tx.get('block_time', 0)
+            if tx_time:
+                block_timestamp = datetime.fromtimestamp(tx_time)
+            else:
+                block_timestamp = datetime.utcnow()
+            
+            # Create Solana whale transaction record
+            whale_tx = WhaleTransaction(
+                transaction_id=tx_signature,
+                wallet_address=to_addr,
+                blockchain='sol',
+                block_number=tx.get('slot', None),
+                block_timestamp=block_timestamp,
+                transaction_index=None,
+                from_address=from_addr,
+                to_address=to_addr,
+                gas_used=None,
+                gas_price=None,
+                coin_symbol=symbol,
+                coin_contract=None,
+                coin_decimals=9,
+                activity_type='transfer',
+                amount_tokens=sol_amount,
+                amount_usd=usd_amount,
+                price_per_token=token_price,
+                raw_transaction=raw_payload('sol', tx),
+                data_source=SCANNER_VERSION,
+                processed_at=datetime.utcnow()
+            )
+            
+            return whale_tx
+            
+        except Exception as e:
+            logger.debug(f"{self.scanner_name} error processing Solana tx: {e}")
+            return None
+    
+    def scan_token_whales(self, symbol, token_info, token_price, start_block, end_block):
+        """Scan for whale transactions in a token with $500 threshold
+        
+        Generator - each page of transfers is threshold-filtered in one batch
+        and its whale records yielded; a failed transfer fetch propagates to
+        the caller.
+        """
+        if token_price <= 0:
+            # Skip scanning tokens without price data
+            return
+        
+        logger.info(f"🔍 {self.scanner_name} scanning {symbol} (${token_price:.6f})...")
+        
+        # Track unique transactions in this scan to prevent duplicates
+        seen_transactions = set()
+        window = raw_whale_window(token_info['decimals'], token_price)
+        
+        pages = self.etherscan.iter_token_transfer_pages(
+            token_info['address'], start_block, end_block, chain_id=token_info.get('chain_id', 1)
+        )
+        
+        whale_count = 0
+        transfer_count = 0
+        
+        chain_name = EVM_CHAINS[token_info.get('chain_id', 1)]['name']
+        
+        for transfers in pages:
+            transfer_count += len(transfers)
+            
+            # Most transfers are below the threshold - only survivors become records
+            with METRICS.timer('stage_seconds', stage='screen'):
+                selected = select_whale_transfers(transfers, window)
+            METRICS.inc('transfers_fetched_total', len(transfers), blockchain=chain_name)
+            METRICS.inc('transfers_screened_total', len(selected), blockchain=chain_name)
+            
+            for transfer in selected:
+                whale_tx = self.build_token_whale(symbol, token_info, token_price, transfer, seen_transactions)
+                if whale_tx:
+                    whale_count += 1
+                    yield whale_tx
+        
+        if not transfer_count:
+            logger.info(f"  {self.scanner_name} no transfers found for {symbol}")
+        elif whale_count:
+            logger.info(f"  🐋 {self.scanner_name} found {whale_count} {symbol} whales in {transfer_count:,} transfers")
+    
+    def build_token_whale(self, symbol, token_info, token_price, transfer, seen_transactions):
+        """Turn one ERC-20 transfer into a whale record - None if filtered out"""
+        try:
+            # Extract basic transfer data
+            tx_hash = transfer.get('hash')
+            from_addr = transfer.get('from', '').lower()
+            to_addr = transfer.get('to', '').lower()
+            raw_amount = transfer.get('value', '0')
+            
+            if not tx_hash or not from_addr or not to_addr or raw_amount == '0':
+                return None
             
-            return True
+            # Skip if we've already processed this transaction in this scan
+            if tx_hash in seen_transactions:
+                return None
+            seen_transactions.add(tx_hash)
             
-        except (ValueError, TypeError, KeyError):
-            return False
+            # Exact token amount - the whale window was applied to the raw value already
+            try:
+                token_amount, usd_amount = token_amounts(raw_amount, token_info['decimals'], token_price)
+            except (InvalidOperation, TypeError):
+                return None
+            
+            # Create transaction record
+            whale_tx = WhaleTransaction(
+                transaction_id=tx_hash,
+                wallet_address=to_addr,  # Receiver is the whale
+                blockchain=EVM_CHAINS[token_info.get('chain_id', 1)]['name'],
+                block_number=int(transfer.get('blockNumber', 0)) if transfer.get('blockNumber') else None,
+                block_timestamp=datetime.fromtimestamp(int(transfer.get('timeStamp', 0))),
+                transaction_index=int(transfer.get('transactionIndex', 0)) if transfer.get('transactionIndex') else None,
+                from_address=from_addr if from_addr else None,
+                to_address=to_addr if to_addr else None,
+                gas_used=int(transfer.get('gasUsed', 0)) if transfer.get('gasUsed') else None,
+                gas_price=int(transfer.get('gasPrice', 0)) if transfer.get('gasPrice') else None,
+                coin_symbol=symbol,
+                coin_contract=token_info['address'].lower(),
+                coin_decimals=token_info['decimals'],
+                activity_type='transfer',  # Use lowercase as required
+                amount_tokens=token_amount,
+                amount_usd=usd_amount,
+                price_per_token=token_price,
+                raw_transaction=raw_payload('eth', transfer),  # JSON string for JSONB
+                data_source=SCANNER_VERSION,  # Master scanner identification
+                processed_at=datetime.utcnow()
+            )
+            
+            return whale_tx
+            
+        except Exception as e:
+            logger.debug(f"{self.scanner_name} error processing {symbol} transfer: {e}")
+            return None
     
-    def save_transactions(self, transactions):
-        """Save transactions with proper error handling"""
-        if not transactions or not self.db_connection:
-            return 0
+    async def scan_all_tokens(self, prices, heads):
+        """Scan all tokens concurrently - Etherscan, Bitcoin and Solana run side by side"""
+        max_workers = ETHERSCAN_CONCURRENCY + BLOCKCYPHER_CONCURRENCY + SOLSCAN_CONCURRENCY + RPC_CONCURRENCY
+        asyncio.get_running_loop().set_default_executor(
+            ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='whale-scan')
+        )
         
-        saved_count = 0
+        # Per-provider concurrency limits; request rate is shared through each client's token bucket
+        limits = {
+            'eth': asyncio.Semaphore(ETHERSCAN_CONCURRENCY),
+            'btc': asyncio.Semaphore(BLOCKCYPHER_CONCURRENCY),
+            'sol': asyncio.Semaphore(SOLSCAN_CONCURRENCY),
+            'rpc': asyncio.Semaphore(RPC_CONCURRENCY),
+        }
+        pipeline = WhalePipeline(self)
         
-        for tx in transactions:
-            # Validate each transaction before attempting to save
-            if not self.validate_transaction_data(tx):
-                logger.debug(f"{self.scanner_name} skipping invalid transaction: {tx.get('transaction_id', 'unknown')}")
-                continue
+        # Tasks queue on the semaphores in creation order - the most urgent tokens run first
+        due, deferred = self.scheduler.plan(self.tokens_to_scan, self.checkpoints, heads)
+        if deferred:
+            logger.info(f"💤 {self.scanner_name} {len(deferred)} dormant tokens wait for a later cycle")
+        log_batches = self.plan_log_batches(due)
+        batched_symbols = {symbol for _, batch in log_batches for symbol in batch}
+        
+        try:
+            tasks = [
+                self.scan_symbol(symbol, token_info, prices, heads, limits, pipeline)
+                for symbol, token_info in due
+                if symbol not in batched_symbols
+            ]
+            batch_tasks = [
+                self.scan_log_batch(chain_id, batch, prices, heads, limits, pipeline)
+                for chain_id, batch in log_batches
+            ]
+            results = await asyncio.gather(*tasks, *batch_tasks)
             
-            try:
-                cur = self.db_connection.cursor()
-                
-                # First ensure wallet exists
-                wallet_query = """
-                    INSERT INTO wallet_accounts (wallet_address) 
-                    VALUES (%(wallet_address)s) 
-                    ON CONFLICT (wallet_address) DO NOTHING;
-                """
-                cur.execute(wallet_query, {'wallet_address': tx['wallet_address']})
-                
-                # Then insert whale transaction
-                query = """
-                    INSERT INTO whale_transactions (
-                        transaction_id, wallet_address, blockchain, block_number, block_timestamp,
-                        transaction_index, from_address, to_address, gas_used, gas_price,
-                        coin_symbol, coin_contract, coin_decimals, activity_type, amount_tokens,
-                        amount_usd, price_per_token, raw_transaction, data_source, processed_at
-                    ) VALUES (
-                        %(transaction_id)s, %(wallet_address)s, %(blockchain)s, %(block_number)s, %(block_timestamp)s,
-                        %(transaction_index)s, %(from_address)s, %(to_address)s, %(gas_used)s, %(gas_price)s,
-                        %(coin_symbol)s, %(coin_contract)s, %(coin_decimals)s, %(activity_type)s, %(amount_tokens)s,
-                        %(amount_usd)s, %(price_per_token)s, %(raw_transaction)s, %(data_source)s, %(processed_at)s
-                    )
-                    ON CONFLICT (transaction_id) DO NOTHING;
-                """
-                
-                cur.execute(query, tx)
-                
-                if cur.rowcount > 0:
-                    saved_count += 1
-                else:
-                    logger.debug(f"{self.scanner_name} skipped duplicate: {tx.get('transaction_id', 'unknown')[:16]}...")
-                
-                # Commit each transaction individually to avoid cascade failures
-                self.db_connection.commit()
-                
-            except IntegrityError as e:
-                logger.debug(f"{self.scanner_name} integrity error (likely duplicate): {str(e)[:100]}")
-                self.db_connection.rollback()
+            # Log batches report one result per symbol
+            symbol_results = list(results[:len(tasks)])
+            for batch_results in results[len(tasks):]:
+                symbol_results.extend(batch_results)
+            symbol_results.extend(('deferred', 0, 0.0) for _ in deferred)
+            return symbol_results
+        finally:
+            await asyncio.to_thread(pipeline.close)
+    
+    def plan_log_batches(self, tokens):
+        """Group (symbol, token_info) pairs into (chain_id, {symbol: token_info}) batches for eth_getLogs
+        
+        Only used with ERC20_ENGINE=getlogs, and only for chains with an RPC
+        URL - everything else stays on the per-contract tokentx engine.
+        Batches keep the order of tokens.
+        """
+        if ERC20_ENGINE != 'getlogs':
+            return []
+        
+        by_chain = {}
+        for symbol, token_info in tokens:
+            chain_id = token_info.get('chain_id', 1)
+            if token_info.get('address') and chain_id in self.evm_rpc:
+                by_chain.setdefault(chain_id, []).append((symbol, token_info))
+        
+        batches = []
+        for chain_id, tokens in sorted(by_chain.items()):
+            for i in range(0, len(tokens), GETLOGS_ADDRESS_BATCH):
+                batches.append((chain_id, dict(tokens[i:i + GETLOGS_ADDRESS_BATCH])))
+        return batches
+    
+    async def scan_log_batch(self, chain_id, tokens, prices, heads, limits, pipeline):
+        """Scan and save a batch of contracts through eth_getLogs, returns one result per symbol"""
+        if self.stop_event.is_set():
+            return []
+        
+        try:
+            async with limits['rpc']:
+                if self.scheduler.exhausted(self.evm_rpc[chain_id].rate_limiter):
+                    return [('deferred', 0, 0.0)] * len(tokens)
                 
-            except DataError as e:
-                logger.warning(f"{self.scanner_name} data error: {str(e)[:100]}")
-                self.db_connection.rollback()
+                await asyncio.to_thread(self.stream_log_batch, pipeline, chain_id, tokens, prices, heads)
                 
-            except Exception as e:
-                logger.warning(f"{self.scanner_name} database error: {type(e).__name__}: {str(e)[:200]}")
-                self.db_connection.rollback()
+                results = []
+                for symbol in tokens:
+                    saved, volume = await asyncio.to_thread(pipeline.finish, symbol)
+                    if saved or volume:
+                        logger.info(f"  ✅ {self.scanner_name} {symbol}: {saved} whales, ${volume:,.0f} volume")
+                    results.append(('eth', saved, volume))
+                return results
             
-            finally:
-                if 'cur' in locals():
-                    cur.close()
-        
-        logger.info(f"💾 {self.scanner_name} saved {saved_count}/{len(transactions)} whale transactions")
-        return saved_count
+        except Exception as e:
+            logger.error(f"❌ {self.scanner_name} error scanning {EVM_CHAINS[chain_id]['name']} log batch of {len(tokens)} tokens: {e}")
+            return [None] * len(tokens)
     
-    def scan_bitcoin_whales(self, symbol, token_price):
-        """Scan native Bitcoin blockchain for whale transactions"""
-        try:
-            logger.info(f"🔍 {self.scanner_name} scanning Bitcoin whales for {symbol} (${token_price:,.2f})...")
+    def stream_log_batch(self, pipeline, chain_id, tokens, prices, heads):
+        """Feed whale transfers of a contract batch to the pipeline chunk by chunk
+        
+        The batch walks from its oldest contract checkpoint; logs below a
+        contract's own checkpoint are skipped, and every contract in range is
+        checkpointed once its chunk has been queued.
+        """
+        rpc = self.evm_rpc[chain_id]
+        
+        # The node's own head - never checkpoint past blocks it has not seen
+        head = rpc.get_latest_block()
+        if chain_id in heads:
+            head = min(head, heads[chain_id])
+        
+        lookback = evm_blocks(chain_id, ETH_DEFAULT_LOOKBACK_BLOCKS)
+        max_catchup = evm_blocks(chain_id, ETH_MAX_CATCHUP_BLOCKS)
+        chunk_size = evm_blocks(chain_id, ETH_CHECKPOINT_CHUNK_BLOCKS)
+        final_block = head - evm_blocks(chain_id, ETH_CACHE_CONFIRMATIONS)  # The tail is rescanned next run
+        
+        plans = {}  # contract -> scan plan of its token
+        for symbol, token_info in tokens.items():
+            scope = evm_scope(token_info['address'], chain_id)
+            start_block, _ = self.get_scan_range(scope, head, lookback, max_catchup)
+            price = prices.get(token_info['coingecko_id'], 0)
+            plans[token_info['address'].lower()] = {
+                'symbol': symbol,
+                'token_info': token_info,
+                'scope': scope,
+                'start_block': start_block,
+                'price': price,
+                'window': raw_whale_window(token_info['decimals'], price),
+                'seen_transactions': set(),
+            }
+        
+        batch_start = min(plan['start_block'] for plan in plans.values())
+        
+        for chunk_start in range(batch_start, head + 1, chunk_size):
+            if self.stop_event.is_set() or self.scheduler.exhausted(rpc.rate_limiter):
+                break
+            
+            chunk_end = min(head, chunk_start + chunk_size - 1)
+            in_range = [plan for plan in plans.values() if plan['start_block'] <= chunk_end]
             
-            # Get recent Bitcoin blocks for scanning
-            whale_transactions = []
-            blocks_to_scan = 25  # ~4 hours of Bitcoin blocks (sustainable for free tier)
+            # Tokens without a price cannot produce whales - checkpoint them without fetching
+            addresses = [contract for contract, plan in plans.items() if plan in in_range and plan['window'] is not None]
+            sub_ranges = range(chunk_start, chunk_end + 1, GETLOGS_BLOCK_RANGE) if addresses else ()
             
-            # Get latest Bitcoin block from BlockCypher
             try:
-                url = f"{self.blockcypher.base_url}?token={self.blockcypher.api_key}"
-                response = self.blockcypher.session.get(url, timeout=30)
+                survivors = []
+                for sub_start in sub_ranges:
+                    sub_end = min(chunk_end, sub_start + GETLOGS_BLOCK_RANGE - 1)
+                    for logs in rpc.iter_transfer_logs(addresses, sub_start, sub_end):
+                        with METRICS.timer('stage_seconds', stage='screen'):
+                            selected = self.select_whale_logs(plans, logs)
+                        METRICS.inc('transfers_fetched_total', len(logs), blockchain=EVM_CHAINS[chain_id]['name'])
+                        METRICS.inc('transfers_screened_total', len(selected), blockchain=EVM_CHAINS[chain_id]['name'])
+                        survivors.extend(selected)
+                
+                # Only whale transfers need their block timestamp
+                missing = {int(transfer['blockNumber']) for _, transfer in survivors if not transfer['timeStamp']}
+                if missing:
+                    timestamps = rpc.get_block_timestamps(missing)
+                    for _, transfer in survivors:
+                        if not transfer['timeStamp']:
+                            transfer['timeStamp'] = str(timestamps[int(transfer['blockNumber'])])
                 
-                if response.status_code == 200:
-                    chain_data = response.json()
-                    latest_block = chain_data.get('height', 0)
-                else:
-                    logger.warning(f"{self.scanner_name} Bitcoin chain info failed: HTTP {response.status_code}")
-                    return []
-                    
             except Exception as e:
-                logger.error(f"{self.scanner_name} Bitcoin chain lookup failed: {e}")
-                return []
+                # Keep every checkpoint of the batch so the next run retries this chunk
+                logger.warning(f"{self.scanner_name} {EVM_CHAINS[chain_id]['name']} logs {chunk_start:,}-{chunk_end:,} failed - checkpoints held: {e}")
+                break
             
-            # Scan recent blocks for whale transactions
-            start_block = max(0, latest_block - blocks_to_scan)
-            logger.info(f"  📊 Scanning Bitcoin blocks {start_block:,} to {latest_block:,}")
+            whales = {}
+            for plan, transfer in survivors:
+                whale_tx = self.build_token_whale(
+                    plan['symbol'], plan['token_info'], plan['price'], transfer, plan['seen_transactions']
+                )
+                if whale_tx:
+                    whales.setdefault(plan['symbol'], []).append(whale_tx)
             
-            # Track unique transactions to prevent duplicates
-            seen_transactions = set()
+            for plan in in_range:
+                pipeline.feed(plan['symbol'], iter(whales.get(plan['symbol'], [])))
+                if min(chunk_end, final_block) >= max(chunk_start, plan['start_block']):
+                    pipeline.checkpoint(plan['symbol'], {plan['scope']: min(chunk_end, final_block)})
             
-            for block_height in range(start_block, latest_block + 1):
-                try:
-                    # Get block data from BlockCypher
-                    block_url = f"{self.blockcypher.base_url}/blocks/{block_height}"
-                    params = {'token': self.blockcypher.api_key, 'limit': 500}
-                    
-                    time.sleep(self.blockcypher.delay)  # Rate limiting
-                    response = self.blockcypher.session.get(block_url, params=params, timeout=30)
-                    
-                    if response.status_code != 200:
-                        logger.debug(f"{self.scanner_name} Bitcoin block {block_height} failed: HTTP {response.status_code}")
-                        continue
-                        
-                    block_data = response.json()
-                    transactions = block_data.get('txs', [])
-                    
-                    # Process transactions in this block
-                    for tx in transactions:
-                        try:
-                            tx_hash = tx.get('hash')
-                            if not tx_hash or tx_hash in seen_transactions:
-                                continue
-                                
-                            seen_transactions.add(tx_hash)
-                            
-                            # Calculate total transaction value
-                            total_value_satoshi = tx.get('total', 0)
-                            if total_value_satoshi <= 0:
-                                continue
-                                
-                            # Convert satoshi to BTC
-                            btc_amount = total_value_satoshi / 100_000_000  # 1 BTC = 100M satoshi
-                            usd_amount = btc_amount * token_price
-                            
-                            # Check whale threshold ($500 minimum)
-                            if usd_amount < WHALE_THRESHOLD_USD or usd_amount > MAX_USD_AMOUNT:
-                                continue
-                            
-                            # Get primary addresses (largest input/output)
-                            inputs = tx.get('inputs', [])
-                            outputs = tx.get('outputs', [])
-                            
-                            from_addr = None
-                            to_addr = None
-                            
-                            if inputs and len(inputs) > 0:
-                                # Get address from largest input
-                                largest_input = max(inputs, key=lambda x: x.get('output_value', 0))
-                                from_addr = largest_input.get('addresses', [None])[0] if largest_input.get('addresses') else None
-                            
-                            if outputs and len(outputs) > 0:
-                                # Get address from largest output  
-                                largest_output = max(outputs, key=lambda x: x.get('value', 0))
-                                to_addr = largest_output.get('addresses', [None])[0] if largest_output.get('addresses') else None
-                            
-                            if not to_addr:  # Need at least destination address
-                                continue
-                            
-                            # Create Bitcoin whale transaction record
-                            whale_tx = {
-                                'transaction_id': tx_hash,
-                                'wallet_address': to_addr,  # Receiver is the whale
-                                'blockchain': 'btc',
-                                'block_number': block_height,
-                                'block_timestamp': datetime.fromisoformat(tx.get('confirmed').replace('Z', '+00:00')) if tx.get('confirmed') else datetime.utcnow(),
-                                'transaction_index': None,  # Bitcoin doesn't use transaction index like Ethereum
-                                'from_address': from_addr,
-                                'to_address': to_addr,
-                                'gas_used': None,  # Bitcoin doesn't use gas
-                                'gas_price': None,  # Bitcoin doesn't use gas
-                                'transaction_fee_usd': None,  # Calculate if needed later
-                                'coin_symbol': symbol,
-                                'coin_contract': None,  # Bitcoin is native, no contract
-                                'coin_decimals': 8,  # Bitcoin has 8 decimal places
-                                'activity_type': 'transfer',
-                                'amount_tokens': btc_amount,
-                                'amount_usd': round(usd_amount, 2),
-                                'price_per_token': token_price,
-                                'raw_transaction': json.dumps(tx),  # Store full transaction data
-                                'data_source': SCANNER_VERSION,
-                                'processed_at': datetime.utcnow()
-                            }
-                            
-                            whale_transactions.append(whale_tx)
-                            
-                        except Exception as e:
-                            logger.debug(f"{self.scanner_name} error processing Bitcoin tx: {e}")
-                            continue
-                    
-                except Exception as e:
-                    logger.debug(f"{self.scanner_name} error scanning Bitcoin block {block_height}: {e}")
-                    continue
+            whale_count = sum(len(found) for found in whales.values())
+            if whale_count:
+                logger.info(f"  🐋 {self.scanner_name} found {whale_count} whales across {len(in_range)} {EVM_CHAINS[chain_id]['name']} contracts in blocks {chunk_start:,}-{chunk_end:,}")
+    
+    def select_whale_logs(self, plans, logs):
+        """(plan, transfer) pairs for Transfer logs inside their token's whale window"""
+        selected = []
+        
+        for log in logs:
+            plan = plans.get(log.get('address', '').lower())
+            topics = log.get('topics') or []
+            if plan is None or len(topics) != 3:
+                continue  # Unknown contract, or an ERC-721 Transfer (tokenId is indexed)
             
-            if whale_transactions:
-                logger.info(f"  🐋 {self.scanner_name} found {len(whale_transactions)} Bitcoin whales")
-            else:
-                logger.info(f"  ⚪ {self.scanner_name} no Bitcoin whales found in recent blocks")
+            if int(log['blockNumber'], 16) < plan['start_block']:
+                continue  # Below this contract's own checkpoint
             
-            return whale_transactions
+            try:
+                raw_amount = int(log.get('data', '0x')[2:66] or '0', 16)
+            except ValueError:
+                continue
             
-        except Exception as e:
-            logger.error(f"❌ {self.scanner_name} Bitcoin whale scan failed: {e}")
-            return []
+            if in_whale_window(raw_amount, plan['window']):
+                selected.append((plan, decode_transfer_log(log)))
+        
+        return selected
     
-    def scan_solana_whales(self, symbol, token_price):
-        """Scan native Solana blockchain for whale transactions"""
+    async def scan_symbol(self, symbol, token_info, prices, heads, limits, pipeline):
+        """Scan and save one token, returns (blockchain, saved, volume) or None on error"""
+        if self.stop_event.is_set():
+            return None
+        
         try:
-            logger.info(f"🔍 {self.scanner_name} scanning Solana whales for {symbol} (${token_price:,.2f})...")
-            
-            # Get whale addresses from environment variable
-            whale_addresses_env = os.getenv('SOLANA_WHALE_ADDRESSES', '')
-            if not whale_addresses_env:
-                logger.warning(f"{self.scanner_name} no SOLANA_WHALE_ADDRESSES configured")
-                return []
+            price = prices.get(token_info['coingecko_id'], 0)
             
-            whale_addresses = [addr.strip() for addr in whale_addresses_env.split(',') if addr.strip()]
-            if not whale_addresses:
-                logger.warning(f"{self.scanner_name} invalid SOLANA_WHALE_ADDRESSES format")
-                return []
+            if price <= 0:
+                price = 0  # Store as $0 value instead of skipping
+                # Silent handling for no price data
             
-            logger.info(f"  📊 Scanning {len(whale_addresses)} Solana whale addresses")
+            # Detect blockchain for this token
+            blockchain = self.detect_blockchain(symbol, token_info)
             
-            # Initialize variables
-            whale_transactions = []
-            seen_transactions = set()
-            url = f"{self.solscan.base_url}/account/transfer"
+            if blockchain is None:
+                logger.info(f"{self.scanner_name} storing {symbol} with unknown blockchain")
+                # Skip transaction scanning for unknown blockchain but count as processed
+                return ('unknown', 0, 0.0)
             
-            # Process each whale address
-            for address in whale_addresses:
-                try:
-                    params = {
-                        'address': address,
-                        'limit': 25,  # Reduced per address for rate limiting
-                        'value[]': ['500', '100000000']  # $500-$100M whale detection range
-                    }
+            # Route to appropriate blockchain scanner
+            async with limits[blockchain]:
+                if blockchain == 'eth':
+                    chain_id = token_info.get('chain_id', 1)
+                    if chain_id not in heads:
+                        return None  # Chain head unavailable this run
+                    if self.scheduler.exhausted(self.etherscan.rate_limiter):
+                        return ('deferred', 0, 0.0)
                     
-                    time.sleep(self.solscan.delay)  # Rate limiting
-                    response = self.solscan.session.get(url, params=params, timeout=30)
+                    def scan_chunk(start, end):
+                        try:
+                            yield from self.scan_token_whales(symbol, token_info, price, start, end)
+                        except Exception as e:
+                            logger.warning(f"{self.scanner_name} {symbol} transfer fetch failed: {e}")
+                            return start - 1
+                        return end
                     
-                    if response.status_code == 200:
-                        data = response.json()
-                        transactions = data.get('data', [])
-                        
-                        logger.info(f"    📊 Address {address[:8]}... returned {len(transactions)} transactions")
-                        
-                        # Process transactions for whale detection from this address
-                        for tx in transactions:
-                            try:
-                                tx_signature = tx.get('trans_id') or tx.get('signature')
-                                if not tx_signature or tx_signature in seen_transactions:
-                                    continue
-                                    
-                                seen_transactions.add(tx_signature)
-                                
-                                # Get transaction amount (SOL is native, 9 decimals)
-                                amount_raw = tx.get('amount', 0)
-                                if not amount_raw:
-                                    continue
-                                    
-                                # Convert to SOL (Solana uses 9 decimals)
-                                sol_amount = float(amount_raw) / 1_000_000_000  # 1 SOL = 1B lamports
-                                usd_amount = sol_amount * token_price
-                                
-                                # Check whale threshold ($500 minimum)
-                                if usd_amount < WHALE_THRESHOLD_USD or usd_amount > MAX_USD_AMOUNT:
-                                    continue
-                                
-                                # Get transaction addresses
-                                from_addr = tx.get('source') or tx.get('from_address')
-                                to_addr = tx.get('destination') or tx.get('to_address')
-                                
-                                if not to_addr:  # Need at least destination address
-                                    continue
-                                
-                                # Get transaction timestamp
-                                tx_time = tx.get('block_time', 0)
-                                if tx_time:
-                                    block_timestamp = datetime.fromtimestamp(tx_time)
-                                else:
-                                    block_timestamp = datetime.utcnow()
-                                
-                                # Create Solana whale transaction record
-                                whale_tx = {
-                                    'transaction_id': tx_signature,
-                                    'wallet_address': to_addr,
-                                    'blockchain': 'sol',
-                                    'block_number': tx.get('slot', None),
-                                    'block_timestamp': block_timestamp,
-                                    'transaction_index': None,
-                                    'from_address': from_addr,
-                                    'to_address': to_addr,
-                                    'gas_used': None,
-                                    'gas_price': None,
-                                    'transaction_fee_usd': None,
-                                    'coin_symbol': symbol,
-                                    'coin_contract': None,
-                                    'coin_decimals': 9,
-                                    'activity_type': 'transfer',
-                                    'amount_tokens': sol_amount,
-                                    'amount_usd': round(usd_amount, 2),
-                                    'price_per_token': token_price,
-                                    'raw_transaction': json.dumps(tx),
-                                    'data_source': SCANNER_VERSION,
-                                    'processed_at': datetime.utcnow()
-                                }
-                                
-                                whale_transactions.append(whale_tx)
-                                
-                            except Exception as e:
-                                logger.debug(f"{self.scanner_name} error processing Solana tx: {e}")
-                                continue
-                        
-                    elif response.status_code == 401:
-                        logger.warning(f"{self.scanner_name} Solscan authentication failed for {address[:8]}...")
-                        continue
-                    else:
-                        logger.debug(f"{self.scanner_name} Solscan HTTP {response.status_code} for {address[:8]}...")
-                        continue
-                        
-                except Exception as e:
-                    logger.debug(f"{self.scanner_name} Solana address {address[:8]}... failed: {e}")
-                    continue
+                    # Windows are defined in mainnet blocks - same wall-clock span on every chain
+                    await self.scan_with_checkpoints(
+                        pipeline, symbol, evm_scope(token_info['address'], chain_id), heads[chain_id],
+                        evm_blocks(chain_id, ETH_DEFAULT_LOOKBACK_BLOCKS), evm_blocks(chain_id, ETH_MAX_CATCHUP_BLOCKS),
+                        evm_blocks(chain_id, ETH_CHECKPOINT_CHUNK_BLOCKS),
+                        scan_chunk, self.etherscan.rate_limiter, evm_blocks(chain_id, ETH_CACHE_CONFIRMATIONS),
+                    )
+                elif blockchain == 'btc':
+                    latest_height = await asyncio.to_thread(self.blockcypher.get_latest_height)
+                    if not latest_height:
+                        return None
+                    if not await asyncio.to_thread(self.check_bitcoin_tail):
+                        return None
+                    await self.scan_with_checkpoints(
+                        pipeline, symbol, 'btc', latest_height,
+                        BTC_DEFAULT_LOOKBACK_BLOCKS, BTC_MAX_CATCHUP_BLOCKS, BTC_CHECKPOINT_CHUNK_BLOCKS,
+                        lambda start, end: self.scan_bitcoin_whales(symbol, price, start, end),
+                        self.blockcypher.rate_limiter, max_blocks=BTC_MAX_BLOCKS_PER_CYCLE,
+                    )
+                else:
+                    cursors = await asyncio.to_thread(pipeline.feed, symbol, self.scan_solana_whales(symbol, price))
+                    if cursors:
+                        await asyncio.to_thread(pipeline.checkpoint, symbol, cursors)
+                
+                saved, volume = await asyncio.to_thread(pipeline.finish, symbol)
             
-            if whale_transactions:
-                logger.info(f"  🐋 {self.scanner_name} found {len(whale_transactions)} Solana whales")
-            else:
-                logger.info(f"  ⚪ {self.scanner_name} no Solana whales found in recent transactions")
+            if not saved and not volume:
+                logger.debug(f"  ⚪ {self.scanner_name} {symbol}: No whales found")
+                return (blockchain, 0, 0.0)
             
-            return whale_transactions
+            logger.info(f"  ✅ {self.scanner_name} {symbol}: {saved} whales, ${volume:,.0f} volume")
+            return (blockchain, saved, volume)
             
         except Exception as e:
-            logger.error(f"❌ {self.scanner_name} Solana whale scan failed: {e}")
-            return []
+            logger.error(f"❌ {self.scanner_name} error scanning {symbol}: {e}")
+            return None
     
-    def scan_token_whales(self, symbol, token_info, token_price, start_block, end_block):
-        """Scan for whale transactions in a token with $500 threshold"""
-        if token_price <= 0:
-            # Skip scanning tokens without price data
-            return []
+    async def scan_with_checkpoints(self, pipeline, symbol, scope, latest_block, lookback, max_catchup, chunk_size, scan_chunk, rate_limiter=None, confirmations=0, max_blocks=None):
+        """Stream from the stored checkpoint to latest_block in bounded chunks into the pipeline
         
-        logger.info(f"🔍 {self.scanner_name} scanning {symbol} (${token_price:.6f})...")
+        scan_chunk(start, end) is a generator that yields whale records and
+        returns completed_through; the checkpoint only advances to
+        completed_through, and a short chunk ends the scan. No new chunk
+        starts once rate_limiter has spent its cycle budget. The checkpoint
+        also stays confirmations blocks below latest_block, so the next run
+        rescans the tail for late-indexed transfers and reorgs. At most
+        max_blocks are scanned per cycle; the rest wait for the next one.
+        """
+        start_block, end_block = self.get_scan_range(scope, latest_block, lookback, max_catchup)
+        if max_blocks is not None and end_block - start_block + 1 > max_blocks:
+            logger.warning(f"{self.scanner_name} {scope} is {end_block - start_block + 1:,} blocks behind - scanning {max_blocks:,} this cycle")
+            end_block = start_block + max_blocks - 1
+        await asyncio.to_thread(
+            self.stream_chunks, pipeline, symbol, scope, start_block, end_block, chunk_size, scan_chunk, rate_limiter,
+            latest_block - confirmations,
+        )
+    
+    def stream_chunks(self, pipeline, symbol, scope, start_block, end_block, chunk_size, scan_chunk, rate_limiter=None, final_block=None):
+        """Feed each chunk's records to the pipeline followed by its checkpoint (never past final_block)
         
-        # Track unique transactions in this scan to prevent duplicates
-        seen_transactions = set()
+        Chunks end on a fixed grid of chunk_size blocks, so a settled chunk is
+        requested with the same range - and cache keys - on every run,
+        wherever the scan resumed.
+        """
+        final_block = end_block if final_block is None else final_block
+        chunk_start = start_block
         
-        transfers = self.etherscan.get_token_transfers(
-            token_info['address'], start_block, end_block
-        )
+        while chunk_start <= end_block:
+            if self.stop_event.is_set():
+                break
+            if rate_limiter is not None and self.scheduler.exhausted(rate_limiter):
+                break
+            
+            chunk_end = min(end_block, (chunk_start // chunk_size + 1) * chunk_size - 1)
+            completed_through = pipeline.feed(symbol, scan_chunk(chunk_start, chunk_end))
+            
+            if min(completed_through, final_block) >= chunk_start:
+                pipeline.checkpoint(symbol, {scope: min(completed_through, final_block)})
+            
+            if completed_through < chunk_end:
+                # Fetch failed - keep the checkpoint so the next run retries the rest of this chunk
+                logger.warning(f"{self.scanner_name} {symbol} blocks {max(completed_through + 1, chunk_start):,}-{chunk_end:,} incomplete - checkpoint held")
+                break
+            
+            chunk_start = chunk_end + 1
+    
+    def get_scan_range(self, scope, latest_block, lookback, max_catchup):
+        """Resume after the scope checkpoint, bounded to max_catchup blocks behind head"""
+        checkpoint = self.checkpoints.get(scope)
         
-        if not transfers:
-            logger.info(f"  {self.scanner_name} no transfers found for {symbol}")
-            return []
+        if checkpoint is None:
+            start_block = latest_block - lookback + 1
+        else:
+            start_block = checkpoint + 1
         
-        whale_transactions = []
+        if latest_block - start_block > max_catchup:
+            logger.warning(f"{self.scanner_name} {scope} is {latest_block - start_block:,} blocks behind - catching up last {max_catchup:,} only")
+            start_block = latest_block - max_catchup
         
-        for transfer in transfers:
-            try:
-                # Extract basic transfer data
-                tx_hash = transfer.get('hash')
-                from_addr = transfer.get('from', '').lower()
-                to_addr = transfer.get('to', '').lower()
-                raw_amount = transfer.get('value', '0')
-                
-                if not tx_hash or not from_addr or not to_addr or raw_amount == '0':
-                    continue
-                
-                # Skip if we've already processed this transaction in this scan
-                if tx_hash in seen_transactions:
-                    continue
-                seen_transactions.add(tx_hash)
-                
-                # Calculate token amount (handle decimals properly)
-                try:
-                    raw_value = float(raw_amount)
-                    token_amount = raw_value / (10 ** token_info['decimals'])
-                    usd_amount = token_amount * token_price
-                except (ValueError, TypeError, ZeroDivisionError):
-                    continue
-                
-                # Check whale threshold ($500 minimum)
-                if usd_amount < WHALE_THRESHOLD_USD or usd_amount > MAX_USD_AMOUNT:
-                    continue
-                
-                # Create transaction record
-                whale_tx = {
-                    'transaction_id': tx_hash,
-                    'wallet_address': to_addr,  # Receiver is the whale
-                    'blockchain': 'eth',
-                    'block_number': int(transfer.get('blockNumber', 0)) if transfer.get('blockNumber') else None,
-                    'block_timestamp': datetime.fromtimestamp(int(transfer.get('timeStamp', 0))),
-                    'transaction_index': int(transfer.get('transactionIndex', 0)) if transfer.get('transactionIndex') else None,
-                    'from_address': from_addr if from_addr else None,
-                    'to_address': to_addr if to_addr else None,
-                    'gas_used': int(transfer.get('gasUsed', 0)) if transfer.get('gasUsed') else None,
-                    'gas_price': int(transfer.get('gasPrice', 0)) if transfer.get('gasPrice') else None,
-                    'transaction_fee_usd': None,  # Calculate if needed
-                    'coin_symbol': symbol,
-                    'coin_contract': token_info['address'].lower(),
-                    'coin_decimals': token_info['decimals'],
-                    'activity_type': 'transfer',  # Use lowercase as required
-                    'amount_tokens': token_amount,
-                    'amount_usd': round(usd_amount, 2),
-                    'price_per_token': token_price,
-                    'raw_transaction': json.dumps(transfer),  # Convert dict to JSON string for JSONB
-                    'data_source': SCANNER_VERSION,  # Master scanner identification
-                    'processed_at': datetime.utcnow()
-                }
-                
-                whale_transactions.append(whale_tx)
-                
-            except Exception as e:
-                logger.debug(f"{self.scanner_name} error processing {symbol} transfer: {e}")
-                continue
+        return max(0, start_block), latest_block
+    
+    def check_bitcoin_tail(self):
+        """Rewind the Bitcoin checkpoint below the first tail block whose hash changed
+        
+        One block lookup per stored tail hash instead of rescanning the tail.
+        Returns False when the tail could not be checked - Bitcoin then waits
+        for the next cycle.
+        """
+        checkpoint = self.checkpoints.get('btc')
+        if checkpoint is None:
+            return True
+        
+        try:
+            with self.db_pool.connection() as conn, conn.cursor() as cur:
+                cur.execute(BLOCK_HASHES_SELECT_SQL, {
+                    'scope': 'btc', 'above': checkpoint - BTC_CACHE_CONFIRMATIONS, 'through': checkpoint,
+                })
+                stored = cur.fetchall()
+            
+        except psycopg.errors.UndefinedTable:
+            logger.warning(f"{self.scanner_name} block hashes unavailable - Bitcoin reorgs go undetected, apply db/migrations/005_scanner_block_hashes.sql")
+            return True
+        
+        except Exception as e:
+            logger.error(f"❌ {self.scanner_name} Bitcoin tail hashes could not be loaded: {e}")
+            return False
+        
+        for height, block_hash in stored:
+            page = self.blockcypher.get_block_page(height, limit=1)
+            if page is None:
+                return False
+            if page.get('hash') != block_hash:
+                logger.warning(f"{self.scanner_name} Bitcoin block {height:,} was reorganized - rescanning from there")
+                self.checkpoints['btc'] = height - 1
+                self.processed_btc_heights = {h for h in self.processed_btc_heights if h < height}
+                break
+        
+        return True
+    
+    def save_block_hashes(self, scope, checkpoint, block_hashes):
+        """Store the hashes of the tail blocks up to checkpoint for the next check_bitcoin_tail"""
+        tail = [
+            {'scope': scope, 'height': height, 'block_hash': block_hashes.get(height)}
+            for height in range(checkpoint - BTC_CACHE_CONFIRMATIONS + 1, checkpoint + 1)
+            if block_hashes.get(height)
+        ]
+        
+        try:
+            with self.db_pool.connection() as conn, conn.cursor() as cur:
+                if tail:
+                    cur.executemany(BLOCK_HASH_UPSERT_SQL, tail)
+                cur.execute(BLOCK_HASHES_PRUNE_SQL, {'scope': scope, 'below': checkpoint - BTC_CACHE_CONFIRMATIONS})
+                conn.commit()
+            
+        except psycopg.errors.UndefinedTable:
+            pass  # Reported by check_bitcoin_tail
+        
+        except Exception as e:
+            logger.warning(f"{self.scanner_name} {scope} block hashes not saved: {type(e).__name__}: {str(e)[:100]}")
+    
+    def load_checkpoints(self):
+        """Load per-scope scan high-water marks - None if they could not be read
+        
+        Only a missing table falls back to the fixed lookback windows. Any
+        other failure must abort the cycle: scanning from the default window
+        would move the stored marks to head and skip the blocks in between.
+        """
+        try:
+            with self.db_pool.connection() as conn, conn.cursor() as cur:
+                cur.execute(CHECKPOINT_SELECT_SQL)
+                checkpoints = {row[0]: row[1] for row in cur.fetchall() if self.owns(scope_shard_key(row[0]))}
+            
+            logger.info(f"📍 {self.scanner_name} loaded {len(checkpoints)} scan checkpoints")
+            return checkpoints
+            
+        except psycopg.errors.UndefinedTable:
+            # Missing migration - fall back to fixed lookback windows
+            logger.warning(f"{self.scanner_name} checkpoints unavailable - apply db/migrations/001_scanner_checkpoints.sql")
+            return {}
         
-        if whale_transactions:
-            logger.info(f"  🐋 {self.scanner_name} found {len(whale_transactions)} {symbol} whales")
+        except Exception as e:
+            logger.error(f"❌ {self.scanner_name} checkpoints could not be loaded: {e}")
+            return None
+    
+    def warm_recent_ids(self):
+        """Seed the dedup index with the most recently stored transaction IDs"""
+        if self.recent_ids.capacity <= 0:
+            return
         
-        return whale_transactions
+        try:
+            with self.db_pool.connection() as conn, conn.cursor() as cur:
+                cur.execute(RECENT_TRANSACTION_IDS_SQL, {'limit': self.recent_ids.capacity})
+                transaction_ids = [row[0] for row in cur.fetchall()]
+            
+            # Oldest first so the newest IDs end up most recently used
+            self.recent_ids.add_many(reversed(transaction_ids))
+            self.recent_ids.warmed = True
+            logger.info(f"🧠 {self.scanner_name} dedup index warmed with {len(transaction_ids):,} recent transaction IDs")
+            
+        except Exception as e:
+            logger.warning(f"{self.scanner_name} dedup index warm-up failed: {type(e).__name__}: {str(e)[:100]}")
+    
+    def load_whale_yields(self):
+        """Whales stored per symbol over the last SCHEDULER_YIELD_DAYS, None if unavailable"""
+        try:
+            since = datetime.utcnow() - timedelta(days=SCHEDULER_YIELD_DAYS)
+            with self.db_pool.connection() as conn, conn.cursor() as cur:
+                cur.execute(WHALE_YIELD_SQL, {'since': since})
+                return {row[0]: row[1] for row in cur.fetchall()}
+            
+        except Exception as e:
+            # Without yields no token counts as dormant - everything is scanned
+            logger.warning(f"{self.scanner_name} whale yields unavailable: {type(e).__name__}: {str(e)[:100]}")
+            return None
+    
+    def save_checkpoints(self, checkpoints):
+        """Persist scope high-water marks (never move backwards)"""
+        try:
+            with METRICS.timer('db_write_seconds', operation='checkpoints'), \
+                    self.db_pool.connection() as conn, conn.cursor() as cur:
+                cur.executemany(CHECKPOINT_UPSERT_SQL, [
+                    {'scope': scope, 'last_block': last_block}
+                    for scope, last_block in sorted(checkpoints.items())
+                ])
+                conn.commit()
+            
+            for scope, last_block in checkpoints.items():
+                self.checkpoints[scope] = max(last_block, self.checkpoints.get(scope) or 0)
+            if 'btc' in checkpoints:
+                self.save_block_hashes('btc', checkpoints['btc'], self.btc_block_hashes)
+            return True
+            
+        except Exception as e:
+            logger.debug(f"{self.scanner_name} checkpoints {', '.join(sorted(checkpoints))} not saved: {e}")
+            return False
     
     def run_master_scan(self):
         """Execute Master whale scan - 2-minute cycles, all tokens, $500 threshold"""
@@ -955,19 +3167,41 @@ class MasterWhaleScanner:
             logger.error(f"❌ {self.scanner_name} database connection failed - mission aborted")
             return False
         
+        with self.scan_lock() as acquired:
+            if not acquired:
+                logger.warning(f"⏭️ {self.scanner_name} another scan still holds the scan lock - skipping this cycle")
+                return True
+            
+            success = self.execute_master_scan(start_time)
+            self.export_metrics(start_time, success)
+            return success
+    
+    def execute_master_scan(self, start_time):
+        """Scan every token once - caller holds the scan lock"""
         try:
-            # Get latest block
-            latest_block = self.etherscan.get_latest_block()
-            if latest_block <= 0:
+            # Get latest block of every EVM chain in the token list
+            heads = self.get_chain_heads()
+            if not heads and self.evm_chain_ids():
                 logger.error(f"❌ {self.scanner_name} cannot determine latest block - mission aborted")
                 return False
             
-            # Calculate 24-hour scan range (optimized for 24-hour cycles)
-            blocks_per_hour = 300  # ~12 seconds per block
-            blocks_back = int(blocks_per_hour * 24)  # 24-hour window = 7200 blocks
-            start_block = max(0, latest_block - blocks_back)
+            # Each contract resumes from its own checkpoint (24-hour window on first run)
+            checkpoints = self.load_checkpoints()
+            if checkpoints is None:
+                logger.error(f"❌ {self.scanner_name} no checkpoints - mission aborted")
+                return False
+            self.checkpoints = checkpoints
+            
+            # Daemon cycles keep the index - only the first run pays for the warm-up
+            if not self.recent_ids.warmed:
+                self.warm_recent_ids()
             
-            logger.info(f"📊 {self.scanner_name} scanning blocks {start_block:,} to {latest_block:,} (24-hour cycle)")
+            # Recent whale yield decides scan order and which tokens are dormant
+            self.scheduler.yields = self.load_whale_yields()
+            
+            if heads:
+                chain_heads = ', '.join(f"{EVM_CHAINS[chain_id]['name']} {block:,}" for chain_id, block in sorted(heads.items()))
+                logger.info(f"📊 {self.scanner_name} scanning up to blocks {chain_heads} from per-contract checkpoints")
             
             # Get token prices from database instead of API
             prices = self.get_prices_from_database()
@@ -976,64 +3210,32 @@ class MasterWhaleScanner:
                 logger.error(f"❌ {self.scanner_name} no token prices retrieved - mission aborted")
                 return False
             
-            # Scan ALL tokens with $500 threshold - MULTI-BLOCKCHAIN
+            # Scan ALL tokens with $500 threshold - MULTI-BLOCKCHAIN (concurrent per provider)
             total_whales = 0
             total_volume = 0.0
-            blockchain_stats = {'eth': 0, 'btc': 0, 'sol': 0, 'skipped': 0}
+            blockchain_stats = {'eth': 0, 'btc': 0, 'sol': 0, 'skipped': 0, 'deferred': 0}
             
-            for symbol, token_info in self.tokens_to_scan.items():
-                try:
-                    price = prices.get(token_info['coingecko_id'], 0)
-                    
-                    if price <= 0:
-                        price = 0  # Store as $0 value instead of skipping
-                        # Silent handling for no price data
-                    
-                    # Detect blockchain for this token
-                    blockchain = self.detect_blockchain(symbol, token_info)
-                    
-                    if blockchain is None:
-                        blockchain = 'unknown'
-                        logger.info(f"{self.scanner_name} storing {symbol} with unknown blockchain")
-                        blockchain_stats['unknown'] = blockchain_stats.get('unknown', 0) + 1
-                    
-                    # Route to appropriate blockchain scanner
-                    if blockchain == 'eth':
-                        whales = self.scan_token_whales(
-                            symbol, token_info, price, start_block, latest_block
-                        )
-                        blockchain_stats['eth'] += 1
-                    elif blockchain == 'btc':
-                        whales = self.scan_bitcoin_whales(symbol, price)
-                        blockchain_stats['btc'] += 1
-                    elif blockchain == 'sol':
-                        whales = self.scan_solana_whales(symbol, price)
-                        blockchain_stats['sol'] += 1
-                    elif blockchain == 'unknown':
-                        # Treat unknown tokens as Ethereum - scan with dummy contract
-                        logger.debug(f"{self.scanner_name} {symbol}: treating as Ethereum (unknown blockchain)")
-                        # Skip transaction scanning for unknown blockchain but count as processed
-                        whales = []
-                        blockchain_stats['unknown'] = blockchain_stats.get('unknown', 0) + 1
-                    else:
-                        logger.warning(f"{self.scanner_name} unsupported blockchain {blockchain} for {symbol}")
-                        blockchain_stats['skipped'] += 1
-                        continue
-                    
-                    if whales:
-                        saved = self.save_transactions(whales)
-                        volume = sum(tx['amount_usd'] for tx in whales)
-                        
-                        total_whales += saved
-                        total_volume += volume
-                        
-                        logger.info(f"  ✅ {self.scanner_name} {symbol}: {saved} whales, ${volume:,.0f} volume")
-                    else:
-                        logger.debug(f"  ⚪ {self.scanner_name} {symbol}: No whales found")
-                    
-                except Exception as e:
-                    logger.error(f"❌ {self.scanner_name} error scanning {symbol}: {e}")
+            rate_limiters = [self.etherscan.rate_limiter, self.blockcypher.rate_limiter, self.solscan.rate_limiter]
+            rate_limiters.extend(rpc.rate_limiter for rpc in self.evm_rpc.values())
+            self.scheduler.start_cycle(rate_limiters)
+            try:
+                results = asyncio.run(self.scan_all_tokens(prices, heads))
+            finally:
+                if self.scheduler.end_cycle():
+                    logger.warning(f"{self.scanner_name} providers returned 429s - next cycle budget share {self.scheduler.headroom:.0%}")
+            
+            for result in results:
+                if result is None:
                     continue
+                blockchain, saved, volume = result
+                blockchain_stats[blockchain] = blockchain_stats.get(blockchain, 0) + 1
+                total_whales += saved
+                total_volume += volume
+            
+            METRICS.set('last_cycle_whales', total_whales)
+            METRICS.set('last_cycle_volume_usd', total_volume)
+            for blockchain, count in blockchain_stats.items():
+                METRICS.set('last_cycle_tokens', count, outcome=blockchain)
             
             # Master scanner mission summary
             duration = (datetime.utcnow() - start_time).total_seconds() / 60
@@ -1051,6 +3253,7 @@ class MasterWhaleScanner:
             logger.info(f"    ₿  Bitcoin: {blockchain_stats['btc']} tokens") 
             logger.info(f"    ◎  Solana: {blockchain_stats['sol']} tokens")
             logger.info(f"    ⚪ Skipped: {blockchain_stats['skipped']} tokens")
+            logger.info(f"    ⏳ Deferred: {blockchain_stats['deferred']} tokens (dormant or over budget)")
             sys.stdout.flush()
             
             return True
@@ -1058,23 +3261,198 @@ class MasterWhaleScanner:
         except Exception as e:
             logger.error(f"❌ {self.scanner_name} master scan failed: {e}")
             return False
+    
+    def export_metrics(self, start_time, success):
+        """Log per-endpoint timings and write METRICS_PATH at the end of a cycle"""
+        METRICS.inc('cycles_total', outcome='success' if success else 'failure')
+        METRICS.set('last_cycle_duration_seconds', (datetime.utcnow() - start_time).total_seconds())
+        METRICS.set('last_cycle_end_timestamp_seconds', time.time())
         
-        finally:
-            if self.db_connection:
-                self.db_connection.close()
-                logger.info(f"📝 {self.scanner_name} database connection closed")
-                sys.stdout.flush()
+        for endpoint, (requests_sent, errors, throttled, latency, waited) in METRICS.endpoint_summary().items():
+            logger.info(
+                f"  ⏱️ {endpoint}: {requests_sent:,} requests, {latency * 1000:.0f}ms mean, "
+                f"{waited:.1f}s rate-limit wait, {throttled} x 429, {errors} errors"
+            )
+        
+        metrics_path = shard_path(METRICS_PATH, self.config.shard_index, self.config.shard_count)
+        if not metrics_path:
+            return
+        
+        try:
+            METRICS.export(metrics_path)
+        except OSError as e:
+            logger.warning(f"{self.scanner_name} metrics export to {metrics_path} failed: {e}")
+    
+    def evm_chain_ids(self):
+        """EVM chains that have at least one token contract to scan"""
+        return sorted({
+            token_info.get('chain_id', 1) for token_info in self.tokens_to_scan.values()
+            if token_info.get('address') and token_info.get('chain_id', 1) in EVM_CHAINS
+        })
+    
+    def get_chain_heads(self):
+        """Latest block per EVM chain with tokens to scan, fetched concurrently
+        
+        Chains whose head cannot be read are left out - their tokens are
+        skipped this run rather than failing the whole scan.
+        """
+        chain_ids = self.evm_chain_ids()
+        if not chain_ids:
+            return {}
+        
+        with ThreadPoolExecutor(max_workers=len(chain_ids), thread_name_prefix='evm-head') as pool:
+            futures = {chain_id: pool.submit(self.etherscan.get_latest_block, chain_id) for chain_id in chain_ids}
+        
+        heads = {}
+        for chain_id, future in futures.items():
+            try:
+                heads[chain_id] = future.result()
+            except Exception as e:
+                logger.warning(f"{self.scanner_name} {EVM_CHAINS[chain_id]['name']} head unavailable - its tokens are skipped this run: {e}")
+        
+        return heads
+    
+    @contextmanager
+    def scan_lock(self):
+        """Hold a session advisory lock so overlapping runs (cron or daemon) of a shard never scan together"""
+        lock_id = SCAN_LOCK_ID + self.config.shard_index
+        with self.db_pool.connection() as conn:
+            acquired = conn.execute("SELECT pg_try_advisory_lock(%s)", (lock_id,)).fetchone()[0]
+            conn.commit()
+            try:
+                yield acquired
+            finally:
+                if acquired:
+                    conn.execute("SELECT pg_advisory_unlock(%s)", (lock_id,))
+                    conn.commit()
+    
+    def refresh_tokens_if_stale(self):
+        """Reload token metadata once it is older than TOKEN_REFRESH_SECONDS"""
+        if time.monotonic() - self.tokens_loaded_at < TOKEN_REFRESH_SECONDS:
+            return
+        
+        try:
+            self.tokens_to_scan = self.load_tokens_for_scanning()
+            self.tokens_loaded_at = time.monotonic()
+        except Exception as e:
+            # Keep scanning with the previous token set
+            logger.warning(f"{self.scanner_name} token refresh failed, keeping {len(self.tokens_to_scan)} cached tokens: {e}")
+    
+    def request_stop(self, signum=None, frame=None):
+        """Signal handler - finish the in-flight chunk, save its checkpoint, then exit"""
+        logger.info(f"🛑 {self.scanner_name} shutdown requested (signal {signum}) - finishing in-flight work")
+        self.stop_event.set()
+    
+    def run_daemon(self):
+        """Run scans every SCAN_INTERVAL_SECONDS (plus jitter) until SIGTERM/SIGINT"""
+        signal.signal(signal.SIGTERM, self.request_stop)
+        signal.signal(signal.SIGINT, self.request_stop)
+        
+        logger.info(f"♻️ {self.scanner_name} daemon mode - every {SCAN_INTERVAL_SECONDS}s (+{SCAN_JITTER_SECONDS}s jitter)")
+        cycles = 0
+        
+        while not self.stop_event.is_set():
+            cycle_start = time.monotonic()
+            cycles += 1
+            
+            try:
+                self.refresh_tokens_if_stale()
+                success = self.run_master_scan()
+            except Exception as e:
+                logger.error(f"❌ {self.scanner_name} cycle {cycles} crashed: {e}")
+                success = False
+            
+            if not success:
+                logger.error(f"❌ {self.scanner_name} cycle {cycles} failed - retrying next interval")
+            
+            elapsed = time.monotonic() - cycle_start
+            if elapsed > SCAN_INTERVAL_SECONDS:
+                logger.warning(f"{self.scanner_name} cycle {cycles} took {elapsed:.0f}s, longer than the {SCAN_INTERVAL_SECONDS}s interval")
+            
+            # Next cycle starts after this one finishes - never overlaps
+            wait = max(0.0, SCAN_INTERVAL_SECONDS - elapsed) + random.uniform(0, SCAN_JITTER_SECONDS)
+            logger.info(f"💤 {self.scanner_name} next cycle in {wait:.0f}s")
+            self.stop_event.wait(wait)
+        
+        logger.info(f"👋 {self.scanner_name} daemon stopped after {cycles} cycles")
+        return True
+    
+    def close(self):
+        """Shut down the HTTP sessions, database pool and response cache"""
+        for api in (self.etherscan, self.coingecko, self.blockcypher, self.solscan, *self.evm_rpc.values()):
+            api.session.close()
+        self.db_pool.close()
+        if self.response_cache is not None:
+            self.response_cache.close()
+        logger.info(f"📝 {self.scanner_name} database connections closed")
+        sys.stdout.flush()
+
+def run_shard(shard_index, shard_count, daemon):
+    """Worker process entry point - scans one shard and exits 0 on success"""
+    configure_logging()
+    scanner = MasterWhaleScanner(ScannerConfig.from_env(shard_index=shard_index, shard_count=shard_count))
+    try:
+        success = scanner.run_daemon() if daemon else scanner.run_master_scan()
+    finally:
+        scanner.close()
+    sys.exit(0 if success else 1)
+
+def run_workers(config, workers, daemon):
+    """Split this node's shard into SCANNER_WORKERS processes, returns True if every one succeeded
+    
+    Node shard i of n becomes worker shards i*workers .. i*workers+workers-1
+    of n*workers, so every node must run the same SCANNER_WORKERS.
+    """
+    context = multiprocessing.get_context('spawn')  # Cheap now that importing the module has no side effects
+    processes = [
+        context.Process(
+            target=run_shard, name=f"shard-{config.shard_index * workers + worker}",
+            args=(config.shard_index * workers + worker, config.shard_count * workers, daemon),
+        )
+        for worker in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    
+    def forward(signum, frame):
+        # Workers finish their in-flight chunk and save its checkpoint
+        for process in processes:
+            if process.is_alive():
+                os.kill(process.pid, signum)
+    
+    signal.signal(signal.SIGTERM, forward)
+    signal.signal(signal.SIGINT, forward)
+    
+    for process in processes:
+        process.join()
+        if process.exitcode != 0:
+            logger.error(f"❌ {SCANNER_NAME} worker {process.name} exited with code {process.exitcode}")
+    return all(process.exitcode == 0 for process in processes)
 
 def main():
-    """Main entry point for Master Scanner cron execution"""
-    print(f"🔧 {SCANNER_NAME}: Starting main function", flush=True)
+    """Main entry point - one-shot cron execution, or a long-running service with --daemon"""
+    configure_logging()
+    logger.info(f"🚀 {SCANNER_NAME} DEPLOYMENT STARTING")
+    logger.info(f"⏰ Execution time: {datetime.utcnow()}")
+    scanner = None
     
     try:
-        print(f"🔧 {SCANNER_NAME}: Creating Master whale scanner instance", flush=True)
-        scanner = MasterWhaleScanner()
+        config = ScannerConfig.from_env()
+        daemon = SCANNER_MODE == 'daemon' or '--daemon' in sys.argv[1:]
         
-        print(f"🔧 {SCANNER_NAME}: Starting master mission", flush=True)
-        success = scanner.run_master_scan()
+        if SCANNER_WORKERS > 1:
+            logger.info(f"🧩 {SCANNER_NAME} starting {SCANNER_WORKERS} shard workers")
+            success = run_workers(config, SCANNER_WORKERS, daemon)
+        else:
+            print(f"🔧 {SCANNER_NAME}: Creating Master whale scanner instance", flush=True)
+            scanner = MasterWhaleScanner(config)
+            
+            if daemon:
+                print(f"🔧 {SCANNER_NAME}: Starting daemon", flush=True)
+                success = scanner.run_daemon()
+            else:
+                print(f"🔧 {SCANNER_NAME}: Starting master mission", flush=True)
+                success = scanner.run_master_scan()
         
     except Exception as e:
         print(f"🔧 {SCANNER_NAME}: Exception caught: {e}", flush=True)
@@ -1082,6 +3460,10 @@ def main():
         sys.stderr.flush()
         exit(1)
     
+    finally:
+        if scanner:
+            scanner.close()
+    
     if success:
         logger.info(f"✅ {SCANNER_NAME} completed mission successfully")
         sys.stdout.flush()